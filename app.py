@@ -1,41 +1,285 @@
 # app.py
 
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request, Response, abort
 import argparse
+import hashlib
+import os
+import threading
+import time
 
-from scripts.scrape import load_data
-from scripts.visualize import (
-    panel1_genre_keyword,
-    panel2_director_matrix,
-    panel3_streamgraph,
-    panel4_global_map,
-    panel5_actor_genre_network,
-    genre_filter_data
-)
+from scripts import metrics
+from scripts.metrics import instrument
+from scripts.payload import assemble, merge_figure, EncodedBody
+from scripts.prerender import write_build, StaticBuild
+from scripts.graphstore import write_store, GraphStore, chunks
+
+# pandas, numpy and plotly (everything under scripts.scrape, model, visualize,
+# pipeline, ...) are imported by the functions that load or build, so a process
+# serving a prebuilt store or build never imports them. See benchmarks/bench_import.py.
 
 app = Flask(__name__)
 
 # Global storage for graph JSONs
 GRAPHS = {}
 
-def run_batch():
-    global GRAPHS
-    print("[INFO] Loading data...")
-    movies = load_data()
+# Loaded tables + per-genre breakdown, shared by the batch and the lazy endpoints
+DATA = {}
+_data_lock = threading.Lock()
+_figure_locks = {}
+_figure_locks_lock = threading.Lock()
+
+# Precompressed responses, keyed by (version, path); a new dataset or code
+# version means new keys, and stale ones are dropped on the next batch.
+ENCODED = {}
+
+# State of the (single) background build, reported by /get_graphs
+BUILD = {"status": "idle", "stage": None, "done": 0, "total": 0, "error": None}
+_build_lock = threading.Lock()
+_build_thread = None
+
+# Serializes /refresh calls
+_refresh_lock = threading.Lock()
+
+# Prebuilt responses served instead of the dataset (--serve-build / --serve-store):
+# {"store": StaticBuild or GraphStore}
+STATIC = {}
+
+def data_version():
+    """
+    Version of every response: the source CSVs, the code and the options
+    that change the figures (--approx-topk). Cheap: no data is loaded.
+    """
+    from scripts import topk
+    from scripts.scrape import dataset_version
+    from scripts.pipeline import CODE_VERSION
+
+    key = f"{dataset_version()}:{CODE_VERSION}"
+    if topk.APPROX_CAPACITY:
+        key += f":approx-topk={topk.APPROX_CAPACITY}"
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+def stored_version(path):
+    """Version of the graph store at `path`, or None if there is no readable one."""
+    try:
+        return GraphStore(path).manifest["version"]
+    except (OSError, ValueError):
+        return None
+
+def get_data():
+    """Load the dataset once (concurrent callers wait for the same load)."""
+    with _data_lock:
+        if not DATA:
+            from scripts.scrape import load_data, load_compact, CHUNKSIZE
+            from scripts.model import build_tables, genre_breakdown, director_stats, DirectorTable
+            from scripts.cube import Cube
+            from scripts.idindex import IdIndex
+            from scripts.search import PeopleIndex
+
+            print("[INFO] Loading data...")
+            options = dict(
+                use_cache=app.config.get("USE_CACHE", True),
+                chunksize=app.config.get("CHUNKSIZE", CHUNKSIZE),
+            )
+            # long-form genre/keyword/country tables shared by every panel
+            if app.config.get("COMPACT"):
+                tables = build_tables(*load_compact(**options))
+            else:
+                tables = build_tables(load_data(**options))
+            version = data_version()
+            DATA.update(
+                tables=tables,
+                breakdown=genre_breakdown(tables),
+                version=version,
+                cube=Cube(tables),
+                movie_index=IdIndex(tables.movies["id"]),
+                directors=DirectorTable(director_stats(tables.movies)),
+                people=PeopleIndex(tables),
+            )
+    return DATA
+
+
+def get_cube():
+    """The year x genre x country cube (rebuilt after a refresh changed the data)."""
+    from scripts.model import build_tables
+    from scripts.cube import Cube
+
+    data = get_data()
+    with _data_lock:
+        if "cube" not in DATA:
+            DATA["cube"] = Cube(build_tables(data["aggregates"].frame()))
+    return DATA["cube"]
+
+
+def get_people():
+    """The actor/director search index (rebuilt after a refresh changed the data)."""
+    from scripts.model import build_tables
+    from scripts.search import PeopleIndex
+
+    data = get_data()
+    with _data_lock:
+        if "people" not in DATA:
+            DATA["people"] = PeopleIndex(build_tables(data["aggregates"].frame()))
+    return DATA["people"]
+
+
+def run_batch(progress=None):
+    from scripts.pipeline import build_graphs
+
+    if progress:
+        progress("loading data")
+    data = get_data()
+    tables = data["tables"]
 
     print("[INFO] Generating visualizations (Plotly)...")
-    GRAPHS["panel1"] = panel1_genre_keyword(movies)
-    GRAPHS["panel2"] = panel2_director_matrix(movies)
-    GRAPHS["panel3"] = panel3_streamgraph(movies)
-    GRAPHS["panel4"] = panel4_global_map(movies)
-    GRAPHS["panel5"] = panel5_actor_genre_network(movies)
-    
-    # build genre-specific panel1, panel5, panel3
-    g1, g5, g3 = genre_filter_data(movies)
-    GRAPHS["genre_panel1"] = g1
-    GRAPHS["genre_panel5"] = g5
-    GRAPHS["genre_panel3"] = g3
+    # panel1-5 plus genre-specific panel1, panel5, panel3
+    start = time.perf_counter()
+    graphs = build_graphs(
+        tables,
+        workers=app.config.get("WORKERS", 1),
+        progress=(lambda done, total: progress("building figures", done, total)) if progress else None,
+        breakdown=data["breakdown"],
+    )
+    GRAPHS.update(graphs)
+    print(f"[INFO] Visualizations ready in {time.perf_counter() - start:.2f}s")
 
+    # compress every response once, up front
+    version = data["version"]
+    for key in [k for k in ENCODED if k[0] != version]:
+        del ENCODED[key]
+    ENCODED[(version, ("get_graphs",))] = EncodedBody(graphs_document(), version)
+    for name, value in GRAPHS.items():
+        if isinstance(value, dict):
+            for g, fig in value.items():
+                ENCODED[(version, (name, g))] = EncodedBody(fig, version)
+        else:
+            ENCODED[(version, (name,))] = EncodedBody(value, version)
+
+
+def graphs_document():
+    """/get_graphs: every figure and genre payload, plus the genre templates."""
+    from scripts.visualize import genre_templates
+
+    return assemble(dict(GRAPHS, templates=genre_templates()))
+
+
+def _report(stage, done=0, total=0):
+    BUILD.update(stage=stage, done=done, total=total)
+
+
+def _build():
+    try:
+        run_batch(progress=_report)
+        BUILD.update(status="ready", stage=None)
+    except Exception as exc:
+        BUILD.update(status="error", error=str(exc))
+        raise
+
+
+def start_build():
+    """
+    Start run_batch() in a background thread, unless a build is already
+    running or finished. Returns the build thread (None once graphs exist).
+    """
+    global _build_thread
+    with _build_lock:
+        if BUILD["status"] == "ready":
+            return None
+        if _build_thread is None or not _build_thread.is_alive():
+            BUILD.update(status="building", stage=None, done=0, total=0, error=None)
+            _build_thread = threading.Thread(target=_build, name="graph-build", daemon=True)
+            _build_thread.start()
+        return _build_thread
+
+
+def cached_figure(path, build):
+    """
+    Return the figure stored under GRAPHS[path[0]][path[1]]..., building it
+    with build() on first use. Each figure is built once even when requested
+    concurrently, and not at all while a background build (start_build) is
+    running: that build makes every figure, so the request waits for it.
+    """
+    def stored():
+        node = GRAPHS
+        for part in path[:-1]:
+            node = node.get(part, {})
+        return node.get(path[-1])
+
+    figure = stored()
+    if figure is not None:
+        return figure
+    thread = _build_thread
+    if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+        thread.join()
+        figure = stored()
+        if figure is not None:
+            return figure
+
+    with _figure_locks_lock:
+        lock = _figure_locks.setdefault(path, threading.Lock())
+    with lock:
+        node = GRAPHS
+        for part in path[:-1]:
+            node = node.setdefault(part, {})
+        if path[-1] not in node:
+            node[path[-1]] = build()
+        return node[path[-1]]
+
+
+def encoded_response(path, body):
+    """
+    Serve the precompressed form of the response stored under `path`
+    (body() builds it on first use), honouring Accept-Encoding and If-None-Match.
+    """
+    key = (get_data()["version"], path)
+    encoded = ENCODED.get(key)
+    if encoded is None:
+        encoded = ENCODED.setdefault(key, EncodedBody(body(), key[0]))
+    return send_encoded(encoded)
+
+
+def send_encoded(encoded):
+    """Response for an EncodedBody (or FileBody), honouring Accept-Encoding and If-None-Match."""
+    encoding = encoded.negotiate(request.accept_encodings)
+    if request.if_none_match.contains(encoded.etags[encoding]):
+        response = Response(status=304)
+    else:
+        body = encoded.body(encoding)
+        if isinstance(body, memoryview):
+            # a slice of the mapped graph store
+            response = Response(chunks(body), mimetype="application/json")
+            response.content_length = len(body)
+        else:
+            response = Response(body, mimetype="application/json")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(encoded.etags[encoding])
+    # always revalidate; unchanged data costs a 304
+    response.headers["Cache-Control"] = "public, no-cache"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+# With --serve-build / --serve-store every figure is answered from the build on
+# disk; nothing is loaded, so the endpoints that need the dataset are unavailable.
+@app.before_request
+def serve_static_build():
+    if not STATIC:
+        return None
+    store = STATIC["store"]
+    if request.endpoint == "graph" and request.view_args.get("panel") == "panel2" and request.args:
+        # the build only holds the default ranking; a slice needs the dataset
+        return jsonify(error="director ranking slices are not available when serving a static build"), 503
+    encoded = store.get(request.path)
+    if encoded is not None:
+        return send_encoded(encoded)
+    if request.endpoint == "status":
+        manifest = store.manifest
+        return jsonify(status="ready", static_build=True, version=manifest["version"], created=manifest["created"])
+    if request.endpoint in ("index", "static", "metrics_endpoint"):
+        return None
+    if request.endpoint in ("graph", "genre_graph", "genre_data", "genre_template"):
+        abort(404)
+    return jsonify(error="not available when serving a static build"), 503
 
 
 # Serve minimal page first; graphs loaded via AJAX
@@ -43,18 +287,363 @@ def run_batch():
 def index():
     return render_template("index.html")
 
-# API endpoint to get graphs (heavy processing happens here)
+# Lazy per-panel endpoints: each figure is built on first request and cached
+@app.route("/genres")
+def genres():
+    return jsonify(list(get_data()["breakdown"]))
+
+@app.route("/graphs/<panel>")
+def graph(panel):
+    from scripts.pipeline import PANELS
+    from scripts.visualize import director_figure
+
+    if panel not in PANELS:
+        abort(404)
+    if panel == "panel2" and request.args:
+        # any slice of the director ranking, e.g. ?sort=rating&offset=100&limit=100
+        try:
+            _, _, rows = director_page(request.args)
+        except ValueError as exc:
+            return jsonify(error=str(exc)), 400
+        return Response(director_figure(rows), mimetype="application/json")
+    return encoded_response((panel,), lambda: cached_figure((panel,), lambda: build_panel(panel)))
+
+def build_panel(panel):
+    from scripts.incremental import aggregates_figure
+    from scripts.pipeline import panel_figure
+
+    data = get_data()
+    # after a refresh the tables are stale; the maintained aggregates are not
+    if "aggregates" in data:
+        return aggregates_figure(data["aggregates"], panel)
+    return panel_figure(data["tables"], panel)
+
+def int_arg(args, name, default):
+    """Integer request argument `name`; ValueError when it isn't one."""
+    value = args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+def director_page(args):
+    """
+    (total, offset, rows): DirectorTable.page() for request arguments
+    sort, order, offset, limit and min_films.
+    """
+    from scripts.model import DirectorTable
+
+    sort = args.get("sort", "revenue")
+    if sort not in DirectorTable.SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(DirectorTable.SORT_KEYS)}")
+    order = args.get("order", "desc")
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be asc or desc")
+    offset = int_arg(args, "offset", 0)
+    limit = int_arg(args, "limit", 100)
+    min_films = int_arg(args, "min_films", 1)
+    if offset < 0 or not 0 < limit <= 1000:
+        raise ValueError("offset must be >= 0 and limit between 1 and 1000")
+    total, rows = get_data()["directors"].page(sort, order == "desc", offset, limit, min_films)
+    return total, offset, rows
+
+# Genre versions of panel1, panel3 and panel5 share one template per panel;
+# GRAPHS keeps only each genre's data payload.
+@app.route("/graphs/<panel>/template")
+def genre_template(panel):
+    from scripts.pipeline import GENRE_FIGURES
+    from scripts.visualize import genre_templates
+
+    if panel not in GENRE_FIGURES:
+        abort(404)
+    return encoded_response(("template", panel), lambda: genre_templates()[panel])
+
+def genre_payload(panel, name):
+    """The cached data payload of a genre figure (404 for unknown panels or genres)."""
+    from scripts.pipeline import genre_panel_data, GENRE_FIGURES
+
+    breakdown = get_data()["breakdown"]
+    if panel not in GENRE_FIGURES or name not in breakdown:
+        abort(404)
+    path = ("genre_" + panel, name)
+    return path, cached_figure(path, lambda: genre_panel_data(breakdown, panel, name))
+
+@app.route("/graphs/<panel>/genre/<name>/data")
+def genre_data(panel, name):
+    path, payload = genre_payload(panel, name)
+    return encoded_response(path, lambda: payload)
+
+# The complete figure, merged from template + data
+@app.route("/graphs/<panel>/genre/<name>")
+def genre_graph(panel, name):
+    from scripts.visualize import genre_templates
+
+    path, payload = genre_payload(panel, name)
+    return encoded_response(path + ("figure",), lambda: merge_figure(genre_templates()[panel], payload))
+
+# Director rankings, paginated:
+# /directors?sort=revenue|rating|films&order=desc|asc&offset=0&limit=100&min_films=1
+@app.route("/directors")
+def directors():
+    try:
+        total, offset, rows = director_page(request.args)
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
+    return jsonify(
+        total=total,
+        offset=offset,
+        directors=[
+            {"rank": int(r.rank), "director": r.director, "revenue": float(r.revenue),
+             "rating": float(r.vote_average), "films": int(r.films)}
+            for r in rows.itertuples(index=False)
+        ],
+    )
+
+# One movie by TMDB id, looked up in the id index (no scan of the frame)
+@app.route("/movie/<int:movie_id>")
+def movie(movie_id):
+    data = get_data()
+    if "aggregates" in data:
+        # refreshed data lives in the aggregates; the tables are the original load
+        record = data["aggregates"].movie(movie_id)
+    else:
+        row = data["movie_index"].row(movie_id)
+        record = data["tables"].movie(row) if row is not None else None
+    if record is None:
+        abort(404)
+    return jsonify(record)
+
+@app.route("/status")
+def status():
+    return jsonify(dict(BUILD, data_loaded=bool(DATA)))
+
+
+# API endpoint to get all graphs at once. The first call starts the build in the background
+# and answers 202 with its progress; ?wait=1 blocks until the graphs are ready.
 @app.route("/get_graphs")
+@instrument("get_graphs", rows=None)
 def get_graphs():
+    thread = start_build()
+    if thread is not None and request.args.get("wait"):
+        thread.join()
+    if BUILD["status"] == "ready":
+        # figures are embedded as JSON objects, not as escaped strings
+        return encoded_response(("get_graphs",), graphs_document)
+    if BUILD["status"] == "error":
+        return jsonify(BUILD), 500
+    return jsonify(BUILD), 202
+
+
+# Incremental refresh: fold new/changed movies from the updates directory into the
+# aggregates and rebuild only the figures they touch.
+@app.route("/refresh", methods=["POST"])
+@instrument("refresh", rows=None)
+def refresh():
+    from scripts.scrape import DATA_DIR
+
+    updates_dir = app.config.get("UPDATES_DIR") or os.path.join(DATA_DIR, "updates")
+    if not os.path.exists(os.path.join(updates_dir, "movies_metadata.csv")):
+        return jsonify(error=f"no updates found in {updates_dir}"), 404
+
+    with _refresh_lock:
+        # deltas apply to a complete set of graphs
+        thread = start_build()
+        if thread is not None:
+            thread.join()
+        if BUILD["status"] != "ready":
+            return jsonify(BUILD), 500
+        return jsonify(apply_updates(updates_dir))
+
+
+def apply_updates(updates_dir):
     global GRAPHS
-    if not GRAPHS:
-        run_batch()
-    return jsonify(GRAPHS)
+    from scripts.scrape import load_updates, compact_frame, dataset_version, CHUNKSIZE
+    from scripts.model import DirectorTable
+    from scripts.incremental import Aggregates, aggregates_figure
+    from scripts.pipeline import genre_panel_data
+
+    data = get_data()
+    start = time.perf_counter()
+    aggregates = data.get("aggregates") or Aggregates.from_tables(data["tables"])
+    updates = load_updates(updates_dir, chunksize=app.config.get("CHUNKSIZE", CHUNKSIZE))
+    if app.config.get("COMPACT"):
+        # same dtypes as the loaded rows, so unchanged movies compare equal
+        updates = compact_frame(updates)
+    changed, dirty = aggregates.update(updates)
+    if not changed:
+        DATA["aggregates"] = aggregates
+        return {"changed": 0, "rebuilt": [], "version": data["version"]}
+
+    old_breakdown = data["breakdown"]
+    genres = aggregates.genres()
+    if genres != list(old_breakdown):
+        # genre_panel5 colours follow the genre's position in the list
+        dirty.update(("genre_panel5", g) for g in genres)
+    dirty_genres = {path[1] for path in dirty if len(path) == 2}
+    breakdown = {
+        g: aggregates.genre_slice(g) if g in dirty_genres else old_breakdown[g]
+        for g in genres
+    }
+
+    # rebuild the dirty figures that were already built, into a new dict
+    graphs = {}
+    for name, value in GRAPHS.items():
+        if isinstance(value, dict):
+            graphs[name] = {
+                g: genre_panel_data(breakdown, name[len("genre_"):], g) if (name, g) in dirty else value[g]
+                for g in breakdown if g in value or (name, g) in dirty
+            }
+        else:
+            graphs[name] = aggregates_figure(aggregates, name) if (name,) in dirty else value
+
+    version = hashlib.sha1(f"{data['version']}:{dataset_version(updates_dir)}".encode()).hexdigest()[:12]
+    # unchanged responses keep their compressed bodies (and ETags) under the new version
+    for (old_version, path), encoded in list(ENCODED.items()):
+        # path[:2]: a genre figure is stale when its data payload is
+        if old_version == data["version"] and path[:2] not in dirty and path != ("get_graphs",):
+            ENCODED[(version, path)] = encoded
+    for key in [k for k in ENCODED if k[0] != version]:
+        del ENCODED[key]
+
+    GRAPHS = graphs
+    DATA.update(aggregates=aggregates, breakdown=breakdown, version=version)
+    if ("panel2",) in dirty:
+        DATA["directors"] = DirectorTable(aggregates.director_stats())
+    DATA.pop("cube", None)
+    DATA.pop("people", None)
+    rebuilt = sorted("/".join(path) for path in dirty if path[0] in graphs)
+    print(f"[INFO] Applied {len(changed)} updated movies, rebuilt {len(rebuilt)} figures "
+          f"in {time.perf_counter() - start:.2f}s")
+    return {"changed": len(changed), "rebuilt": rebuilt, "version": version}
+
+
+# Cross-filtered panels from the aggregate cube, e.g.
+# /query?genre=Drama&years=1990-2000&country=France (&panels=panel1,panel3)
+@app.route("/query")
+@instrument("query", rows=None)
+def query():
+    from scripts.cube import parse_years
+    from scripts.incremental import aggregates_figure
+    from scripts.pipeline import PANELS
+
+    panels = request.args.get("panels", ",".join(PANELS)).split(",")
+    if any(p not in PANELS for p in panels):
+        return jsonify(error=f"unknown panel in {panels}"), 400
+    try:
+        years = parse_years(request.args.get("years"))
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
+    try:
+        cube_slice = get_cube().query(
+            genre=request.args.get("genre") or None,
+            country=request.args.get("country") or None,
+            years=years,
+        )
+    except KeyError as exc:
+        return jsonify(error=f"unknown genre or country: {exc.args[0]}"), 404
+    graphs = {name: aggregates_figure(cube_slice, name) for name in panels}
+    return Response(assemble(graphs), mimetype="application/json")
+
+
+# Actor/director autocomplete, e.g. /search?q=tom%20h&limit=10&role=actor|director;
+# every match comes with its aggregates unless &details=0
+@app.route("/search")
+@instrument("search", rows=None)
+def search():
+    from scripts.search import ROLES, MAX_LIMIT
+
+    query = request.args.get("q", "")
+    role = request.args.get("role") or None
+    try:
+        limit = int_arg(request.args, "limit", 10)
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
+    if role is not None and role not in ROLES:
+        return jsonify(error=f"role must be one of {', '.join(ROLES)}"), 400
+    if not 0 < limit <= MAX_LIMIT:
+        return jsonify(error=f"limit must be between 1 and {MAX_LIMIT}"), 400
+    people = get_people()
+    matches = people.search(query, limit, role)
+    describe = people.person if request.args.get("details", "1") != "0" else people.summary
+    return jsonify(query=query, matches=[describe(person) for person in matches])
+
+
+# Per-stage timings, CPU, memory and output sizes (JSON, or ?format=prometheus)
+@app.route("/metrics")
+def metrics_endpoint():
+    if request.args.get("format") == "prometheus":
+        return Response(metrics.prometheus(), mimetype="text/plain; version=0.0.4")
+    return jsonify(metrics.snapshot())
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always re-read the CSVs instead of using data/.cache/")
+    parser.add_argument("--chunksize", type=int,
+                        help="rows per chunk when streaming credits/keywords (0 = read whole files, "
+                             "default: CHUNKSIZE in scripts/scrape.py)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes used to build the panels (1 = build in-process)")
+    parser.add_argument("--prewarm", action="store_true",
+                        help="build the graphs in the background as soon as the server starts")
+    parser.add_argument("--compact", action="store_true",
+                        help="keep the dataset in compact form (categoricals, narrow numerics, packed lists)")
+    parser.add_argument("--approx-topk", type=int, metavar="N",
+                        help="count top keywords/actors approximately with N Space-Saving counters")
+    parser.add_argument("--updates-dir", metavar="DIR",
+                        help="where POST /refresh reads new/changed movies (default: data/updates/)")
+    parser.add_argument("--build", metavar="DIR",
+                        help="write every response, precompressed, plus a manifest to DIR and exit")
+    parser.add_argument("--serve-build", metavar="DIR",
+                        help="serve a build written by --build without loading any data")
+    parser.add_argument("--build-store", metavar="FILE",
+                        help="write every response into one memory-mappable graph store FILE and exit")
+    parser.add_argument("--serve-store", metavar="FILE",
+                        help="serve a graph store written by --build-store (see wsgi.py for gunicorn)")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="dump a cProfile file per instrumented stage into DIR")
     args = parser.parse_args()
+    metrics.PROFILE_DIR = args.profile
+    if args.approx_topk:
+        from scripts import topk
+        topk.APPROX_CAPACITY = args.approx_topk
+    app.config["USE_CACHE"] = not args.no_cache
+    if args.chunksize is not None:
+        app.config["CHUNKSIZE"] = args.chunksize
+    app.config["WORKERS"] = args.workers
+    app.config["UPDATES_DIR"] = args.updates_dir
+    app.config["COMPACT"] = args.compact
+    if args.build:
+        from scripts.visualize import genre_templates
+        run_batch()
+        manifest = write_build(args.build, GRAPHS, genre_templates(), list(DATA["breakdown"]), DATA["version"])
+        size = sum(entry["bytes"]["identity"] for entry in manifest["files"].values())
+        print(f"[INFO] Wrote {len(manifest['files'])} responses ({size / 1e6:.1f} MB uncompressed) to {args.build}")
+        raise SystemExit(0)
+    if args.build_store:
+        from scripts.visualize import genre_templates
+        # like the pickle cache: same CSVs, code and options -> same responses
+        if stored_version(args.build_store) == data_version():
+            print(f"[INFO] Graph store {args.build_store} is up to date; not rebuilding.")
+            raise SystemExit(0)
+        run_batch()
+        store_index = write_store(args.build_store, GRAPHS, genre_templates(), list(DATA["breakdown"]),
+                                  DATA["version"])
+        print(f"[INFO] Wrote {len(store_index['files'])} responses ({os.path.getsize(args.build_store) / 1e6:.1f} MB) "
+              f"to {args.build_store}")
+        raise SystemExit(0)
+    if args.serve_store:
+        STATIC["store"] = GraphStore(args.serve_store)
+        print(f"[INFO] Serving graph store {STATIC['store'].manifest['version']} from {args.serve_store}")
+    if args.serve_build:
+        STATIC["store"] = StaticBuild(args.serve_build)
+        print(f"[INFO] Serving static build {STATIC['store'].manifest['version']} from {args.serve_build}")
+    # debug=True runs the app in a reloader child; only warm up there
+    if args.prewarm and not STATIC and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_build()
     print("[INFO] Starting Flask server.")
     app.run(port=args.port, debug=True)
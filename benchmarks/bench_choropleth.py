@@ -0,0 +1,67 @@
+# benchmarks/bench_choropleth.py
+
+"""
+Panel 4: px.choropleth with locationmode="country names" (previous
+implementation) against one go.Choropleth trace per tier located by ISO-3
+code. Prints timings and which countries each path cannot place.
+
+    python benchmarks/bench_choropleth.py [DATA_DIR]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd
+import plotly.express as px
+
+from scripts import countries
+from scripts.scrape import load_data
+from scripts.model import build_tables, country_counts
+from scripts.visualize import world_map_figure
+
+
+def legacy_figure(counts):
+    """The previous world_map_figure (styling omitted, it costs the same on both paths)."""
+    df = pd.DataFrame({"country": counts.index.astype(str), "count": counts.to_numpy()})
+    labels = ["No Data", "1-10", "11-50", "51-100", "101-500", ">500"]
+    df["production_level"] = pd.cut(df["count"], bins=[-1, 0, 10, 50, 100, 500, 99999], labels=labels)
+    fig = px.choropleth(
+        df,
+        locations="country",
+        locationmode="country names",
+        color="production_level",
+        hover_name="country",
+        hover_data={"count": True, "production_level": False},
+        category_orders={"production_level": labels},
+    )
+    return fig.to_json()
+
+
+def best_of(fn, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(data_dir):
+    counts = country_counts(build_tables(load_data(data_dir)))
+    legacy_figure(counts), world_map_figure(counts)  # warm Plotly's validators
+
+    print(f"{'px.choropleth (before)':<28}{best_of(legacy_figure, counts) * 1000:>8.1f} ms")
+    print(f"{'go.Choropleth by ISO-3':<28}{best_of(world_map_figure, counts) * 1000:>8.1f} ms")
+
+    names = counts.index.astype(str).tolist()
+    missing = countries.unmatched(names)
+    print(f"\n{len(names)} countries, {len(missing)} without an ISO-3 code (not drawn):")
+    for name in missing:
+        print(f"  {name} ({int(counts[name])} movies)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
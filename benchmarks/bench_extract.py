@@ -0,0 +1,73 @@
+# benchmarks/bench_extract.py
+
+"""
+Compare the ast.literal_eval helpers against scripts.extract, per column.
+
+    python benchmarks/bench_extract.py [DATA_DIR]
+
+DATA_DIR defaults to ./data (the Kaggle download).
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scripts import extract
+from scripts.scrape import parse_json
+
+
+# ---------- Reference (previous) implementations ----------
+def ast_names(entry):
+    items = parse_json(entry)
+    return [d["name"] for d in items] if isinstance(items, list) else []
+
+def ast_top_actor(entry):
+    cast_list = parse_json(entry)
+    return cast_list[0]["name"] if cast_list else None
+
+def ast_director(entry):
+    for item in parse_json(entry):
+        if item.get("job") == "Director":
+            return item.get("name")
+    return None
+
+
+COLUMNS = [
+    # (csv, column, reference, fast)
+    ("movies_metadata.csv", "genres", ast_names, extract.names),
+    ("movies_metadata.csv", "production_countries", ast_names, extract.names),
+    ("keywords.csv", "keywords", ast_names, extract.names),
+    ("credits.csv", "cast", ast_top_actor, extract.first_name),
+    ("credits.csv", "crew", ast_director, extract.director),
+]
+
+
+def timed(fn, cells):
+    start = time.perf_counter()
+    out = [fn(c) for c in cells]
+    return out, time.perf_counter() - start
+
+
+def main(data_dir):
+    frames = {}
+    print(f"{'column':<22}{'rows':>8}{'ast (s)':>10}{'fast (s)':>10}{'speedup':>9}")
+    for csv, column, reference, fast in COLUMNS:
+        if csv not in frames:
+            frames[csv] = pd.read_csv(os.path.join(data_dir, csv), low_memory=False)
+        cells = frames[csv][column].tolist()
+
+        expected, t_ref = timed(reference, cells)
+        got, t_fast = timed(fast, cells)
+        if got != expected:
+            bad = next(i for i, (a, b) in enumerate(zip(got, expected)) if a != b)
+            raise SystemExit(f"[ERROR] {column}: mismatch at row {bad}: {got[bad]!r} != {expected[bad]!r}")
+
+        print(f"{column:<22}{len(cells):>8}{t_ref:>10.3f}{t_fast:>10.3f}{t_ref / t_fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "data"))
@@ -0,0 +1,73 @@
+# benchmarks/bench_genre_filter.py
+
+"""
+Time the per-genre aggregation behind genre_filter_data: the previous
+row-by-row loop plus one full-frame scan per genre, against the single-pass
+genre_breakdown() over the long-form tables.
+
+    python benchmarks/bench_genre_filter.py [DATA_DIR]
+"""
+
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scripts.scrape import load_data
+from scripts.model import build_tables, genre_breakdown
+from scripts.visualize import genre_filter_data
+
+
+def legacy_breakdown(movies):
+    """The aggregation genre_filter_data used to do before building figures."""
+    genre_keywords = defaultdict(lambda: defaultdict(int))
+    genre_actors = defaultdict(lambda: defaultdict(int))
+    for _, row in movies.iterrows():
+        genres = row.get("genres_list") or []
+        keywords = row.get("keywords_list") or []
+        top_actor = row.get("top_actor")
+        for g in genres:
+            for kw in keywords:
+                genre_keywords[g][kw] += 1
+            if top_actor:
+                genre_actors[g][top_actor] += 1
+
+    result = {}
+    for g in sorted(genre_keywords):
+        kw = sorted(genre_keywords[g].items(), key=lambda x: x[1], reverse=True)[:25]
+        ac = sorted(genre_actors[g].items(), key=lambda x: x[1], reverse=True)[:30]
+        mask = movies["genres_list"].apply(lambda lst: g in lst if isinstance(lst, list) else False)
+        revenue = movies[mask].groupby("year")["revenue"].sum()
+        result[g] = (kw, ac, revenue)
+    return result
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(data_dir):
+    movies = load_data(data_dir)
+
+    t_legacy = timed(legacy_breakdown, movies)
+    t_tables = timed(build_tables, movies)
+    tables = build_tables(movies)
+    t_single = timed(genre_breakdown, tables)
+    t_full = timed(genre_filter_data, movies, tables, repeat=1)
+
+    print(f"rows: {len(movies)}  genres: {tables.genres['genre'].nunique()}")
+    print(f"legacy aggregation        {t_legacy:8.3f} s")
+    print(f"build_tables              {t_tables:8.3f} s")
+    print(f"genre_breakdown           {t_single:8.3f} s  ({t_legacy / t_single:.1f}x)")
+    print(f"genre_filter_data (total) {t_full:8.3f} s  (figures included)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,88 @@
+# benchmarks/bench_import.py
+
+"""
+Cold import cost of the server, summarised from `python -X importtime`.
+
+Each target is imported in a fresh interpreter; the report gives the
+total import time, peak RSS right after the import, and the top-level
+packages that took the longest (self time summed over their modules).
+
+    python benchmarks/bench_import.py [--top 8] [--repeat 3]
+
+Targets: `app` (what a process serving a prebuilt store imports),
+`wsgi` (a gunicorn worker) and `app + pipeline` (the build path).
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+TARGETS = {
+    "app": "import app",
+    "wsgi": "import wsgi",
+    "app + pipeline": "import app, scripts.pipeline",
+}
+
+# prints peak RSS (MB) after the import; ru_maxrss is KB on Linux, bytes on macOS
+RSS = "; import resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1 << (20 if sys.platform == 'darwin' else 10)))"
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def importtime(statement, env):
+    """({module: (self µs, cumulative µs, depth)}, peak RSS MB) for one fresh import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import sys; " + statement + RSS],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            modules[name] = (int(own), int(cumulative), len(indent) // 2)
+    return modules, float(result.stdout.split()[-1])
+
+
+def summarise(modules, top):
+    total = sum(cumulative for _, cumulative, depth in modules.values() if depth == 0)
+    by_package = defaultdict(int)
+    for name, (own, _, _) in modules.items():
+        by_package[name.split(".")[0]] += own
+    ranked = sorted(by_package.items(), key=lambda item: -item[1])[:top]
+    return total / 1000, ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=8, help="packages listed per target")
+    parser.add_argument("--repeat", type=int, default=3, help="imports per target (the fastest is reported)")
+    args = parser.parse_args()
+
+    # wsgi.py maps the store at import; point it at one that exists
+    env = dict(os.environ)
+    store = env.get("GRAPH_STORE") or os.path.join(ROOT, "data", ".cache", "graphs.store")
+    targets = dict(TARGETS)
+    if not os.path.exists(store):
+        print(f"[INFO] No graph store at {store}; skipping wsgi (python app.py --build-store FILE)")
+        del targets["wsgi"]
+    env["GRAPH_STORE"] = store
+
+    print(f"{'target':<18}{'import ms':>11}{'peak MB':>10}   slowest packages (self ms)")
+    for label, statement in targets.items():
+        runs = [importtime(statement, env) for _ in range(args.repeat)]
+        modules, rss = min(runs, key=lambda run: summarise(run[0], 0)[0])
+        total, ranked = summarise(modules, args.top)
+        packages = ", ".join(f"{name} {own / 1000:.0f}" for name, own in ranked)
+        print(f"{label:<18}{total:>11.0f}{rss:>10.1f}   {packages}")
+        heavy = [name for name in ("pandas", "numpy", "plotly") if name in modules]
+        print(f"{'':<18}heavy modules imported: {', '.join(heavy) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
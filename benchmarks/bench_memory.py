@@ -0,0 +1,62 @@
+# benchmarks/bench_memory.py
+
+"""
+Memory of the loaded dataset: load_data() (Python lists, object strings)
+versus load_compact() (categoricals, narrow numerics, packed lists).
+Each mode loads and builds the tables in a fresh process, so the peak RSS
+of the two can be compared.
+
+    python benchmarks/bench_memory.py [DATA_DIR]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scripts.metrics import peak_rss_mb
+from scripts.model import build_tables
+from scripts.scrape import load_data, load_compact, memory_usage
+
+
+def measure(mode, data_dir):
+    if mode == "compact":
+        movies, lists = load_compact(data_dir)
+        tables = build_tables(movies, lists)
+    else:
+        movies, lists = load_data(data_dir), None
+        tables = build_tables(movies)
+    return {
+        "rows": len(tables),
+        "frame_mb": memory_usage(movies, lists) / (1 << 20),
+        "columns": {col: int(movies[col].memory_usage(deep=True)) for col in movies.columns},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main(data_dir):
+    # warm the cache so both modes read the same pickle
+    load_data(data_dir)
+    results = {}
+    for mode in ("lists", "compact"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", mode, data_dir or ""],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[mode] = json.loads(out.strip().splitlines()[-1])
+
+    print(f"{'':<10}{'rows':>8}{'frame (MB)':>12}{'peak RSS (MB)':>15}")
+    for mode, r in results.items():
+        print(f"{mode:<10}{r['rows']:>8}{r['frame_mb']:>12.1f}{r['peak_rss_mb']:>15.1f}")
+    print("\nper column (bytes, deep):")
+    for mode, r in results.items():
+        print(f"  {mode}: " + ", ".join(f"{col}={n}" for col, n in r["columns"].items()))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        print(json.dumps(measure(sys.argv[2], sys.argv[3] or None)))
+    else:
+        main(sys.argv[1] if len(sys.argv) > 1 else None)
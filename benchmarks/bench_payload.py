@@ -0,0 +1,63 @@
+# benchmarks/bench_payload.py
+
+"""
+/get_graphs payload: jsonify() of figure strings (double-encoded) versus
+scripts.payload.assemble() (figures embedded as-is). Reports body size,
+server serialization time and the time to decode it the way the client does.
+
+    python benchmarks/bench_payload.py [DATA_DIR]
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask import Flask, jsonify
+
+from scripts.scrape import load_data
+from scripts.model import build_tables
+from scripts.pipeline import build_graphs
+from scripts.payload import assemble
+
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def parse_double(body):
+    # what app.js used to do: parse the document, then every figure string again
+    graphs = json.loads(body)
+    for key, value in graphs.items():
+        if isinstance(value, dict):
+            graphs[key] = {g: json.loads(fig) for g, fig in value.items()}
+        else:
+            graphs[key] = json.loads(value)
+    return graphs
+
+
+def main(data_dir):
+    graphs = build_graphs(build_tables(load_data(data_dir)))
+    app = Flask(__name__)
+
+    with app.app_context():
+        before, t_before = best_of(lambda: jsonify(graphs).get_data())
+    after, t_after = best_of(lambda: assemble(graphs))
+
+    _, p_before = best_of(lambda: parse_double(before))
+    _, p_after = best_of(lambda: json.loads(after))
+
+    print(f"{'':<22}{'bytes':>12}{'serialize (ms)':>16}{'client parse (ms)':>19}")
+    print(f"{'jsonify (before)':<22}{len(before):>12}{t_before * 1000:>16.1f}{p_before * 1000:>19.1f}")
+    print(f"{'assemble (after)':<22}{len(after):>12}{t_after * 1000:>16.1f}{p_after * 1000:>19.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,64 @@
+# benchmarks/bench_search.py
+
+"""
+Actor/director lookup: a case-insensitive scan of the movies frame per
+query against scripts.search.PeopleIndex (bisect over sorted name
+prefixes). Prints the index build time and the mean time per query.
+
+    python benchmarks/bench_search.py [DATA_DIR] [--queries a,to,tom,tom h]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scripts.scrape import load_data
+from scripts.model import build_tables
+from scripts.search import PeopleIndex, ROLES
+
+
+def scan(movies, query, limit=10):
+    """The naive way: match every row, then count films per person."""
+    counts = []
+    for column in ROLES.values():
+        names = movies[column].dropna().astype(str)
+        hits = names[names.str.lower().str.contains(query.lower(), regex=False)]
+        counts.append(hits.value_counts())
+    ranked = sorted((-n, name) for c in counts for name, n in c.items())
+    return [name for _, name in ranked[:limit]]
+
+
+def per_query(fn, *args, repeat=50):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data_dir", nargs="?")
+    parser.add_argument("--queries", default="a,to,tom,tom h", help="comma-separated queries")
+    args = parser.parse_args()
+
+    tables = build_tables(load_data(args.data_dir))
+    start = time.perf_counter()
+    index = PeopleIndex(tables)
+    print(f"PeopleIndex: {len(index)} people, {len(index.keys)} keys, built in {time.perf_counter() - start:.3f}s\n")
+
+    print(f"{'query':<12}{'scan ms':>10}{'index ms':>10}{'person() ms':>13}   top match")
+    for query in args.queries.split(","):
+        matches = index.search(query)
+        scan_ms = per_query(scan, tables.movies, query, repeat=5) * 1000
+        index_ms = per_query(index.search, query) * 1000
+        person_ms = per_query(index.person, matches[0]) * 1000 if matches else 0.0
+        top = index.summary(matches[0]) if matches else None
+        label = f"{top['name']} ({top['role']}, {top['films']} films)" if top else "-"
+        print(f"{query!r:<12}{scan_ms:>10.2f}{index_ms:>10.3f}{person_ms:>13.3f}   {label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_topk.py
+
+"""
+Top-k keywords (panel1) and top keywords per genre (genre panels): the
+groupby over every (genre, keyword) pair, against scripts.topk in exact
+(bincount) and approximate (Space-Saving) mode. Reports time, peak traced
+allocations and, for the approximate mode, how many of the exact top-k
+it recovers.
+
+    python benchmarks/bench_topk.py [DATA_DIR] [--capacity 500,2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scripts import topk
+from scripts.scrape import load_data
+from scripts.model import build_tables, keywords_per_genre, top_keywords, genre_keyword_chunks
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / (1 << 20)
+
+
+def groupby_top(tables):
+    """What panel1 and the genre breakdown did before scripts.topk."""
+    pairs = keywords_per_genre(tables)
+    overall = pairs.groupby(level="keyword", observed=True).sum().nlargest(50)
+    per_genre = pairs.groupby(level="genre", observed=True, group_keys=False).nlargest(25)
+    return overall, per_genre
+
+
+def genre_keywords(tables):
+    """Top 25 keywords per genre, as genre_breakdown() counts them (in the current mode)."""
+    genres = tables.genres["genre"].cat.categories
+    top = topk.grouped_top_k(genre_keyword_chunks(tables), len(genres), tables.keywords["keyword"].cat.categories, 25)
+    return {genres[code]: series for code, series in top.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data_dir", nargs="?")
+    parser.add_argument("--capacity", default="500,2000", help="Space-Saving counter counts to try")
+    args = parser.parse_args()
+
+    tables = build_tables(load_data(args.data_dir))
+    # Space-Saving only saves memory over bincount when there are more names than counters
+    print(f"{len(tables.keywords['keyword'].cat.categories)} distinct keywords, "
+          f"{sum(len(g) for g, _ in genre_keyword_chunks(tables))} (genre, keyword) pairs\n")
+    print(f"{'':<26}{'seconds':>10}{'peak MB':>10}{'top-50 hit':>12}{'genre hit':>11}")
+
+    _, t, mb = measure(groupby_top, tables)
+    print(f"{'groupby (before)':<26}{t:>10.3f}{mb:>10.1f}")
+
+    topk.APPROX_CAPACITY = None
+    exact, t1, mb1 = measure(top_keywords, tables, 50)
+    exact_genres, t2, mb2 = measure(genre_keywords, tables)
+    print(f"{'topk exact':<26}{t1 + t2:>10.3f}{max(mb1, mb2):>10.1f}")
+
+    for capacity in [int(c) for c in args.capacity.split(",")]:
+        topk.APPROX_CAPACITY = capacity
+        approx, t1, mb1 = measure(top_keywords, tables, 50)
+        approx_genres, t2, mb2 = measure(genre_keywords, tables)
+        hit = len(set(approx.index) & set(exact.index)) / max(len(exact), 1)
+        genre_hit = (sum(len(set(approx_genres[g].index) & set(exact_genres[g].index)) for g in exact_genres)
+                     / max(sum(len(s) for s in exact_genres.values()), 1))
+        label = f"topk approx ({capacity})"
+        print(f"{label:<26}{t1 + t2:>10.3f}{max(mb1, mb2):>10.1f}{hit:>12.0%}{genre_hit:>11.0%}")
+    topk.APPROX_CAPACITY = None
+
+
+if __name__ == "__main__":
+    main()
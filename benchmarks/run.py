@@ -0,0 +1,192 @@
+# benchmarks/run.py
+
+"""
+Time and memory-profile every stage of the dashboard pipeline.
+
+    python benchmarks/run.py --scale 1 [--out results.json] [--compare previous.json]
+    python benchmarks/run.py --data data/
+
+With --scale a synthetic dataset of that size is generated (once) under
+benchmarks/.data/scale-<N>/. Results are written as JSON, one entry per
+stage with wall time, peak traced allocations and process RSS, so two runs
+can be compared with --compare.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.synthetic import generate
+from scripts import extract
+from scripts.metrics import peak_rss_mb
+from scripts.scrape import load_data, parse_countries, parse_genres, parse_keywords, SOURCES
+from scripts.model import build_tables
+from scripts.payload import assemble, EncodedBody
+from scripts.pipeline import build_graphs
+from scripts.visualize import (
+    panel1_genre_keyword,
+    panel2_director_matrix,
+    panel3_streamgraph,
+    panel4_global_map,
+    panel5_actor_genre_network,
+    genre_filter_data,
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class Stages:
+    def __init__(self, trace=True):
+        # tracemalloc gives per-stage peaks but slows allocation-heavy stages down
+        self.trace = trace
+        self.results = []
+
+    def run(self, name, fn, *args, **kwargs):
+        if self.trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        peak = 0
+        if self.trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.results.append({
+            "stage": name,
+            "seconds": round(elapsed, 4),
+            "peak_alloc_mb": round(peak / (1 << 20), 2),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        })
+        print(f"[BENCH] {name:<22}{elapsed:9.3f} s{peak / (1 << 20):10.1f} MB")
+        return result
+
+
+def read_csvs(data_dir):
+    return (
+        pd.read_csv(os.path.join(data_dir, "movies_metadata.csv"), low_memory=False),
+        pd.read_csv(os.path.join(data_dir, "credits.csv")),
+        pd.read_csv(os.path.join(data_dir, "keywords.csv")),
+    )
+
+
+def parse_lists(movies, credits, keywords):
+    movies = movies.assign(
+        genres_list=movies["genres"].map(parse_genres),
+        countries=movies["production_countries"].map(parse_countries),
+    )
+    keywords = keywords.assign(keywords_list=keywords["keywords"].map(parse_keywords))
+    credits = credits.assign(
+        top_actor=credits["cast"].map(extract.first_name),
+        director=credits["crew"].map(extract.director),
+    )
+    return movies, credits, keywords
+
+
+def merge(movies, credits):
+    movies = movies.assign(id=pd.to_numeric(movies["id"], errors="coerce")).dropna(subset=["id"])
+    return movies.astype({"id": int}).merge(credits[["id", "top_actor", "director"]], on="id", how="left")
+
+
+def run(data_dir, trace=True):
+    stages = Stages(trace)
+
+    # ---------- Ingestion ----------
+    raw = stages.run("csv_read", read_csvs, data_dir)
+    parsed = stages.run("list_parsing", parse_lists, *raw)
+    stages.run("merge", merge, parsed[0], parsed[1])
+    del raw, parsed
+    # cold load (parses the CSVs and writes the cache), then a warm one, on a
+    # copy of the sources: the caller's data/.cache/ (movies.pkl, the graph
+    # store live servers map) is never touched
+    with tempfile.TemporaryDirectory(prefix="bench-") as scratch:
+        for name in SOURCES:
+            shutil.copy2(os.path.join(data_dir, name), scratch)
+        stages.run("load_data", load_data, scratch)
+        movies = stages.run("load_data_cached", load_data, scratch)
+
+    # ---------- Panels ----------
+    tables = stages.run("build_tables", build_tables, movies)
+    for name, fn in [
+        ("panel1", panel1_genre_keyword),
+        ("panel2", panel2_director_matrix),
+        ("panel3", panel3_streamgraph),
+        ("panel4", panel4_global_map),
+        ("panel5", panel5_actor_genre_network),
+    ]:
+        stages.run(name, fn, movies, tables)
+    stages.run("genre_filter_data", genre_filter_data, movies, tables)
+
+    # ---------- Serialization ----------
+    graphs = build_graphs(tables)
+    body = stages.run("json_assemble", assemble, graphs)
+    stages.run("json_compress", EncodedBody, body, "bench")
+
+    return movies, stages.results
+
+
+def compare(results, previous):
+    old = {r["stage"]: r for r in previous["stages"]}
+    print(f"\n{'stage':<22}{'before':>10}{'after':>10}{'change':>9}")
+    for r in results:
+        if r["stage"] in old and old[r["stage"]]["seconds"]:
+            before = old[r["stage"]]["seconds"]
+            print(f"{r['stage']:<22}{before:>10.3f}{r['seconds']:>10.3f}{r['seconds'] / before:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--data", help="directory with the three CSVs")
+    source.add_argument("--scale", type=float, default=1.0, help="synthetic dataset scale (default 1)")
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="skip per-stage allocation tracking (faster, timings only)")
+    args = parser.parse_args()
+
+    data_dir = args.data
+    if data_dir is None:
+        data_dir = os.path.join(HERE, ".data", f"scale-{args.scale:g}")
+        if not os.path.exists(os.path.join(data_dir, "credits.csv")):
+            print(f"[INFO] Generating synthetic dataset (scale {args.scale:g})...")
+            generate(data_dir, scale=args.scale)
+
+    movies, results = run(data_dir, trace=not args.no_tracemalloc)
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "data_dir": os.path.abspath(data_dir),
+            "scale": None if args.data else args.scale,
+            "movies": len(movies),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "tracemalloc": not args.no_tracemalloc,
+        },
+        "stages": results,
+    }
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Results written to {args.out}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
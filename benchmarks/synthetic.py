@@ -0,0 +1,131 @@
+# benchmarks/synthetic.py
+
+"""
+Synthetic movies_metadata.csv / credits.csv / keywords.csv in the same
+stringified-list format as the Kaggle TMDB dump, at any scale.
+
+    python benchmarks/synthetic.py OUT_DIR [--scale 10] [--seed 0]
+
+--scale 1 writes as many movies as the real dataset (45,466); name pools
+(actors, directors, keywords) grow with the scale so cardinalities stay
+realistic. A few rows carry the dirt of the real files: unparseable ids,
+missing dates, empty lists and names with quotes.
+"""
+
+import argparse
+import csv
+import os
+import random
+
+BASE_ROWS = 45466
+
+GENRES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary",
+    "Drama", "Family", "Fantasy", "Foreign", "History", "Horror", "Music",
+    "Mystery", "Romance", "Science Fiction", "TV Movie", "Thriller", "War",
+    "Western",
+]
+
+COUNTRIES = [
+    ("US", "United States of America"), ("GB", "United Kingdom"), ("FR", "France"),
+    ("DE", "Germany"), ("IT", "Italy"), ("CA", "Canada"), ("JP", "Japan"),
+    ("ES", "Spain"), ("RU", "Russia"), ("IN", "India"), ("HK", "Hong Kong"),
+    ("SE", "Sweden"), ("AU", "Australia"), ("KR", "South Korea"), ("BE", "Belgium"),
+    ("DK", "Denmark"), ("FI", "Finland"), ("CN", "China"), ("BR", "Brazil"),
+    ("MX", "Mexico"), ("CI", "Cote D'Ivoire"), ("SU", "Soviet Union"),
+    ("XC", "Czechoslovakia"), ("NL", "Netherlands"), ("AR", "Argentina"),
+]
+
+JOBS = ["Director", "Screenplay", "Producer", "Editor", "Original Music Composer",
+        "Director of Photography", "Casting", "Writer"]
+
+FIRST = ["John", "Mary", "Jean", "Zoë", "Renée", "Li", "Ana", "Tom", "Sofia", "Hiro"]
+LAST = ["Smith", "O'Brien", "Dupont", "Müller", "Rossi", "Tanaka", "Kim", "García"]
+
+
+def _person(i):
+    # mostly plain names, some with apostrophes / non-ASCII like the real data
+    return f"{FIRST[i % len(FIRST)]} {LAST[(i // len(FIRST)) % len(LAST)]} {i}"
+
+
+def _lit(items):
+    return repr(items)
+
+
+def _zipf(rng, n):
+    # skewed choice so a few names are very common, like real credits
+    return min(int(rng.paretovariate(1.2)) - 1, n - 1)
+
+
+def generate(out_dir, scale=1.0, seed=0, rows=None):
+    """Write the three CSVs to `out_dir`; returns the number of movies."""
+    rng = random.Random(seed)
+    n = rows or max(1, int(BASE_ROWS * scale))
+    n_people = max(50, n // 2)
+    n_directors = max(20, n // 8)
+    n_keywords = max(100, n // 3)
+    os.makedirs(out_dir, exist_ok=True)
+
+    ids = list(range(2, n + 2))
+
+    with open(os.path.join(out_dir, "movies_metadata.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["adult", "budget", "genres", "id", "original_language", "overview",
+                    "production_countries", "release_date", "revenue", "runtime",
+                    "title", "vote_average", "vote_count"])
+        for movie_id in ids:
+            genres = [{"id": GENRES.index(g), "name": g}
+                      for g in rng.sample(GENRES, rng.choice([0, 1, 1, 2, 2, 3, 4]))]
+            countries = [{"iso_3166_1": c, "name": name}
+                         for c, name in rng.sample(COUNTRIES[:8] if rng.random() < 0.8 else COUNTRIES,
+                                                   rng.choice([0, 1, 1, 1, 2]))]
+            if rng.random() < 0.01:
+                date = ""
+            else:
+                date = f"{rng.randint(1900, 2020)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            revenue = 0 if rng.random() < 0.8 else rng.randint(1000, 2_000_000_000)
+            raw_id = str(movie_id) if rng.random() > 0.0005 else "1997-08-20"
+            w.writerow([
+                "False", rng.randint(0, 10**8), _lit(genres), raw_id, "en",
+                "A synthetic overview, with a comma.", _lit(countries), date, revenue,
+                rng.randint(60, 180), f"Movie {movie_id}", round(rng.uniform(0, 10), 1),
+                rng.randint(0, 5000),
+            ])
+
+    with open(os.path.join(out_dir, "keywords.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["id", "keywords"])
+        for movie_id in ids:
+            kws = {_zipf(rng, n_keywords) for _ in range(rng.choice([0, 2, 4, 6, 10]))}
+            w.writerow([movie_id, _lit([{"id": k, "name": f"keyword {k}"} for k in sorted(kws)])])
+
+    with open(os.path.join(out_dir, "credits.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["cast", "crew", "id"])
+        for movie_id in ids:
+            cast = [{
+                "cast_id": j, "character": rng.choice(["Himself", "The 'Boss'", "Jo {", "Narrator"]),
+                "credit_id": f"52fe{movie_id:08x}{j:04x}", "gender": rng.randint(0, 2),
+                "id": p, "name": _person(p), "order": j,
+                "profile_path": None if rng.random() < 0.3 else f"/{p}.jpg",
+            } for j, p in enumerate(_zipf(rng, n_people) for _ in range(rng.choice([0, 5, 10, 15, 25])))]
+            crew = [{
+                "credit_id": f"52fe{movie_id:08x}{j:04x}", "department": "Crew",
+                "gender": rng.randint(0, 2), "id": p,
+                "job": JOBS[0] if j == 1 else rng.choice(JOBS),
+                "name": _person(10**6 + p), "profile_path": None,
+            } for j, p in enumerate(_zipf(rng, n_directors) for _ in range(rng.choice([0, 3, 6, 12])))]
+            w.writerow([_lit(cast), _lit(crew), movie_id])
+
+    return n
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiple of the real dataset size")
+    parser.add_argument("--rows", type=int, default=None, help="exact number of movies (overrides --scale)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    count = generate(args.out_dir, args.scale, args.seed, args.rows)
+    print(f"[INFO] Wrote {count} synthetic movies to {args.out_dir}")
@@ -0,0 +1,29 @@
+# gunicorn.conf.py
+
+"""
+gunicorn -c gunicorn.conf.py wsgi:app
+
+WEB_CONCURRENCY sets the number of workers, PORT the port, GRAPH_STORE
+where the graph store is written and read, BUILD_ARGS extra app.py
+options for the build (e.g. "--compact --workers 4").
+"""
+
+import os
+import shlex
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STORE_PATH = os.environ.get("GRAPH_STORE") or os.path.join(ROOT, "data", ".cache", "graphs.store")
+os.environ["GRAPH_STORE"] = STORE_PATH  # inherited by the workers
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+
+
+def on_starting(server):
+    # one build for all workers, in a child process so the arbiter stays small;
+    # app.py keeps a store that is already up to date
+    server.log.info("Building graph store %s (if out of date)", STORE_PATH)
+    command = [sys.executable, os.path.join(ROOT, "app.py"), "--build-store", STORE_PATH]
+    subprocess.run(command + shlex.split(os.environ.get("BUILD_ARGS", "")), cwd=ROOT, check=True)
@@ -27,4 +27,4 @@ kaggle datasets download -d rounakbanik/the-movies-dataset -p data
 unzip -o data/the-movies-dataset.zip -d data
 echo
 
-python3 app.py --port ${PORT}
+python3 app.py --port ${PORT} --prewarm
@@ -0,0 +1,119 @@
+# scripts/cache.py
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Bump whenever load_data() changes what ends up in the cleaned frame,
+# so stale caches are rebuilt instead of silently reused.
+CACHE_VERSION = 2
+
+# Last fingerprint seen per file, so later calls in this process only stat()
+_KNOWN = {}
+
+
+# ---------- Source fingerprints ----------
+def file_hash(path, block_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def fingerprint(paths, previous=None):
+    """
+    Size, mtime and sha1 of every source file.
+    The hash is only recomputed when size or mtime differ from `previous`,
+    so an unchanged dataset is validated with a couple of stat() calls.
+    """
+    previous = previous or {}
+    result = {}
+    for name, path in paths.items():
+        st = os.stat(path)
+        old = previous.get(name) or _KNOWN.get(os.path.abspath(path)) or {}
+        if old.get("size") == st.st_size and old.get("mtime_ns") == st.st_mtime_ns:
+            digest = old["sha1"]
+        else:
+            digest = file_hash(path)
+        result[name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": digest}
+        _KNOWN[os.path.abspath(path)] = result[name]
+    return result
+
+
+def same_sources(a, b):
+    """Sources are considered unchanged when sizes and contents match (mtime may differ)."""
+    if a.keys() != b.keys():
+        return False
+    return all(a[k]["size"] == b[k]["size"] and a[k]["sha1"] == b[k]["sha1"] for k in a)
+
+
+# ---------- List-offset encoding ----------
+def pack_lists(series):
+    """
+    Encode a column of Python lists as (offsets, codes, categories):
+    row i holds categories[codes[offsets[i]:offsets[i + 1]]].
+    """
+    lists = [lst if isinstance(lst, list) else [] for lst in series]
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([len(lst) for lst in lists], out=offsets[1:])
+    flat = pd.Series([x for lst in lists for x in lst], dtype=object)
+    codes, categories = pd.factorize(flat)
+    return offsets, codes.astype(np.int32), np.asarray(categories, dtype=object)
+
+
+def unpack_lists(offsets, codes, categories):
+    values = categories[codes].tolist()
+    return [values[a:b] for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+# ---------- Cache file ----------
+def read_cache(path, sources):
+    """Return (frame, lists) from the cache at `path`, or None when missing or stale."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except Exception:
+        return None
+    if payload.get("version") != CACHE_VERSION:
+        return None
+
+    current = fingerprint(sources, previous=payload["sources"])
+    if not same_sources(current, payload["sources"]):
+        return None
+    if current != payload["sources"]:
+        # contents unchanged but files were touched: refresh stored mtimes
+        payload["sources"] = current
+        _write(path, payload)
+    return payload["frame"], payload["lists"]
+
+
+def write_cache(path, source_fingerprint, frame, lists):
+    """`source_fingerprint` should be taken before the sources were read."""
+    payload = {
+        "version": CACHE_VERSION,
+        "sources": source_fingerprint,
+        "frame": frame,
+        "lists": lists,
+    }
+    _write(path, payload)
+
+
+def _write(path, payload):
+    # write to a temp file next to the target and rename, so readers never see a partial cache
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
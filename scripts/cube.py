@@ -0,0 +1,219 @@
+# scripts/cube.py
+
+"""
+Year x genre x country aggregate cube for cross-filtering.
+
+Every measure the panels need is pre-aggregated per (genre, country, year)
+cell, with an extra ALL genre and ALL country so that a movie with several
+genres or countries is still counted once when that dimension is not
+filtered. Each table is sorted by (genre, country, year) and indexed, so a
+query is a handful of slices plus a small groupby instead of a scan of
+`movies`.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.model import rank_counts, nest_by_genre, ratings
+
+# code of the ALL member of the genre and country dimensions
+ALL = 0
+
+Query = namedtuple("Query", ["genre", "country", "years"])
+
+
+class _Indexed:
+    """A cell-level table sorted by (genre, country, year), sliced by cell range."""
+
+    def __init__(self, frame):
+        frame = frame.sort_values(["genre", "country", "year"], kind="stable").reset_index(drop=True)
+        self.frame = frame
+        self.years = frame["year"].to_numpy()
+        pairs = frame[["genre", "country"]].to_numpy()
+        starts = np.flatnonzero(np.r_[True, (pairs[1:] != pairs[:-1]).any(axis=1)]) if len(frame) else []
+        stops = np.r_[starts[1:], len(frame)] if len(frame) else []
+        self.index = {(int(pairs[a, 0]), int(pairs[a, 1])): (a, b) for a, b in zip(starts, stops)}
+
+    def rows(self, genre, country, years):
+        start, stop = self.index.get((genre, country), (0, 0))
+        if years is not None:
+            span = self.years[start:stop]
+            start, stop = (start + np.searchsorted(span, years[0], "left"),
+                           start + np.searchsorted(span, years[1], "right"))
+        return self.frame.iloc[start:stop]
+
+
+def _codes(values):
+    """(int32 codes starting at 1, sorted names) for a column of names (NaN -> 0)."""
+    codes, names = pd.factorize(values, sort=True)
+    return (codes + 1).astype(np.int32), list(names)
+
+
+class Cube:
+    def __init__(self, tables):
+        movies = tables.movies
+        n = len(movies)
+        movie_ids = np.arange(n, dtype=np.int32)
+
+        # genre and country dimensions, code 0 (ALL) for every movie
+        self.genres = list(tables.genres["genre"].cat.categories)
+        self.countries = list(tables.countries["country"].cat.categories)
+        genre_dim = pd.DataFrame({
+            "movie": np.r_[movie_ids, tables.genres["movie"].to_numpy()],
+            "genre": np.r_[np.zeros(n, np.int32), tables.genres["genre"].cat.codes.to_numpy() + 1],
+        })
+        country_dim = pd.DataFrame({
+            "movie": np.r_[movie_ids, tables.countries["movie"].to_numpy()],
+            "country": np.r_[np.zeros(n, np.int32), tables.countries["country"].cat.codes.to_numpy() + 1],
+        })
+        facts = genre_dim.merge(country_dim, on="movie")
+        movie = facts["movie"].to_numpy()
+        facts["year"] = movies["year"].to_numpy()[movie]
+        cell = ["genre", "country", "year"]
+
+        revenue = movies["revenue"].to_numpy(dtype=float)[movie]
+        rating = ratings(movies)[movie]
+
+        # ---------- Movies, revenue, ratings ----------
+        self.cells = _Indexed(facts.assign(
+            movies=1,
+            revenue=np.nan_to_num(revenue),
+            rating_sum=np.nan_to_num(rating),
+            rating_n=~np.isnan(rating),
+        ).groupby(cell, sort=False)[["movies", "revenue", "rating_sum", "rating_n"]].sum().reset_index())
+
+        # ---------- Keywords ----------
+        # ALL-genre cells count a keyword once per genre of the movie, like panel1
+        kw = tables.keywords
+        self.keywords = list(kw["keyword"].cat.categories)
+        pairs = facts[facts["genre"] != ALL].merge(
+            pd.DataFrame({"movie": kw["movie"].to_numpy(), "keyword": kw["keyword"].cat.codes.to_numpy()}),
+            on="movie",
+        )
+        per_genre = pairs.groupby(cell + ["keyword"], sort=False).size().rename("count").reset_index()
+        all_genres = per_genre.groupby(["country", "year", "keyword"], sort=False)["count"].sum().reset_index()
+        self.keyword_cells = _Indexed(pd.concat([per_genre, all_genres.assign(genre=ALL)], ignore_index=True))
+
+        # ---------- Top actors ----------
+        # only movies with at least one genre count, as in panel5
+        actor_codes, self.actors = _codes(movies["top_actor"])
+        has_genre = (tables.n_genres > 0)[movie]
+        facts["actor"] = actor_codes[movie]
+        actors = facts[(facts["actor"] > 0) & has_genre]
+        self.actor_cells = _Indexed(
+            actors.groupby(cell + ["actor"], sort=False).size().rename("count").reset_index()
+        )
+
+        # ---------- Directors ----------
+        director_codes, self.directors = _codes(movies["director"])
+        self.director_cells = _Indexed(facts.assign(
+            director=director_codes[movie],
+            films=movies["title"].notna().to_numpy()[movie],
+            revenue=np.nan_to_num(revenue),
+            revenue_n=~np.isnan(revenue),
+            rating_sum=np.nan_to_num(rating),
+            rating_n=~np.isnan(rating),
+        ).query("director > 0").groupby(cell + ["director"], sort=False)[
+            ["films", "revenue", "revenue_n", "rating_sum", "rating_n"]
+        ].sum().reset_index())
+
+        self.actor_codes = {a: i + 1 for i, a in enumerate(self.actors)}
+        self._genre_codes = {g: i + 1 for i, g in enumerate(self.genres)}
+        self._country_codes = {c: i + 1 for i, c in enumerate(self.countries)}
+
+    def __len__(self):
+        return len(self.cells.frame)
+
+    def query(self, genre=None, country=None, years=None):
+        """
+        CubeSlice for one genre and/or country (None = all) and an inclusive
+        (first, last) year range (None = all years). Unknown names raise KeyError.
+        """
+        return CubeSlice(self, Query(
+            self._genre_codes[genre] if genre is not None else ALL,
+            self._country_codes[country] if country is not None else ALL,
+            years,
+        ))
+
+
+class CubeSlice:
+    """Panel inputs for one query, with the same methods as incremental.Aggregates."""
+
+    def __init__(self, cube, query):
+        self.cube = cube
+        self.q = query
+
+    def _genre_codes(self):
+        # a genre filter narrows the per-genre breakdowns to that genre
+        return [self.q.genre] if self.q.genre != ALL else range(1, len(self.cube.genres) + 1)
+
+    def top_keywords(self, n=50):
+        rows = self.cube.keyword_cells.rows(self.q.genre, self.q.country, self.q.years)
+        counts = rows.groupby("keyword")["count"].sum()
+        counts.index = [self.cube.keywords[i] for i in counts.index]
+        return rank_counts(counts[counts > 0], n)
+
+    def director_stats(self):
+        rows = self.cube.director_cells.rows(self.q.genre, self.q.country, self.q.years)
+        d = rows.groupby("director")[["films", "revenue", "revenue_n", "rating_sum", "rating_n"]].sum()
+        frame = pd.DataFrame({
+            "director": [self.cube.directors[i - 1] for i in d.index],
+            "vote_average": d["rating_sum"] / d["rating_n"].where(d["rating_n"] > 0),
+            "revenue": d["revenue"] / d["revenue_n"].where(d["revenue_n"] > 0),
+            "title": d["films"],
+        }).reset_index(drop=True)
+        return frame.dropna().sort_values("director").reset_index(drop=True)
+
+    def genre_year_revenue(self):
+        parts = []
+        for code in self._genre_codes():
+            rows = self.cube.cells.rows(code, self.q.country, self.q.years)
+            parts.append(pd.DataFrame({
+                "year": rows["year"].to_numpy(),
+                "genre": self.cube.genres[code - 1],
+                "revenue": rows["revenue"].to_numpy(),
+            }))
+        frame = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["year", "genre", "revenue"])
+        return frame.sort_values(["year", "genre"]).reset_index(drop=True)
+
+    def country_counts(self):
+        countries = [self.q.country] if self.q.country != ALL else range(1, len(self.cube.countries) + 1)
+        counts = {}
+        for code in countries:
+            total = int(self.cube.cells.rows(self.q.genre, code, self.q.years)["movies"].sum())
+            if total:
+                counts[self.cube.countries[code - 1]] = total
+        return rank_counts(pd.Series(counts, dtype="int64"))
+
+    def top_actors_by_genre(self, top=30):
+        rows = self.cube.actor_cells.rows(self.q.genre, self.q.country, self.q.years)
+        counts = rows.groupby("actor")["count"].sum()
+        counts.index = [self.cube.actors[i - 1] for i in counts.index]
+        top_names = rank_counts(counts, top).index
+        wanted = {self.cube.actor_codes[name] for name in top_names}
+
+        pairs = []
+        for code in self._genre_codes():
+            rows = self.cube.actor_cells.rows(code, self.q.country, self.q.years)
+            rows = rows[rows["actor"].isin(wanted)]
+            g = self.cube.genres[code - 1]
+            pairs.extend(((g, self.cube.actors[a - 1]), n) for a, n in rows.groupby("actor")["count"].sum().items())
+        return nest_by_genre(pairs, top_names)
+
+
+def parse_years(text):
+    """'1990-2000' or '1995' -> inclusive (first, last) tuple; None/'' -> None."""
+    if not text:
+        return None
+    first, dash, last = text.partition("-")
+    if not dash:
+        last = first
+    try:
+        first, last = int(first), int(last)
+    except ValueError:
+        raise ValueError(f"years must be YEAR or FIRST-LAST, got {text!r}") from None
+    if first > last:
+        raise ValueError(f"empty year range: {text}")
+    return first, last
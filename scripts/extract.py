@@ -0,0 +1,141 @@
+# scripts/extract.py
+
+"""
+Field extraction straight from the stringified lists in the TMDB CSVs.
+
+The CSV cells are Python reprs of lists of dicts, e.g.
+    [{'id': 16, 'name': 'Animation'}, {'id': 35, 'name': 'Comedy'}]
+Instead of building every dict with ast.literal_eval, a single regex pass
+tokenizes the `'key': value` pairs and only the needed fields are kept.
+Cells that don't look like a list literal, or whose needed values don't
+decode (`'name': }`, `'name': nan`), go through ast.literal_eval like the
+old scripts.scrape helpers, with the same result ([] or None when the
+cell doesn't parse).
+"""
+
+import ast
+import re
+
+# 'key': value  — value is a quoted Python string or a bare token (int, None, ...).
+# The optional leading "{" marks the first pair of a new dict.
+_PAIR = re.compile(
+    r"""(\{)?\s*'(\w+)':\s*('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|[^,}\]]*)"""
+)
+
+# What _decode raises on a value that isn't a literal: empty, nan, ...
+_DECODE_ERRORS = (ValueError, SyntaxError, IndexError)
+
+
+def _is_list_literal(cell):
+    return isinstance(cell, str) and cell.startswith("[") and cell.endswith("]")
+
+
+def _decode(token):
+    if token[0] not in "'\"":
+        return ast.literal_eval(token)
+    if "\\" in token:
+        return ast.literal_eval(token)
+    return token[1:-1]
+
+
+def _slow_items(cell):
+    # same semantics as scrape.parse_json, kept local to avoid a circular import
+    try:
+        items = ast.literal_eval(cell)
+    except Exception:
+        return []
+    return items if isinstance(items, list) else []
+
+
+# ---------- Extractors ----------
+# Each public extractor tries the regex pass on list literals and falls back
+# to the ast path for every other cell, or when a needed value won't decode.
+def names(cell):
+    """[d['name'] for d in cell] — genres, keywords and production countries."""
+    if _is_list_literal(cell):
+        try:
+            return [_decode(m.group(3)) for m in _PAIR.finditer(cell) if m.group(2) == "name"]
+        except _DECODE_ERRORS:
+            pass
+    return [d["name"] for d in _slow_items(cell)]
+
+
+def first_name(cell):
+    """Name of the first cast member, or None."""
+    if _is_list_literal(cell):
+        try:
+            return _first_name(cell)
+        except _DECODE_ERRORS:
+            pass
+    items = _slow_items(cell)
+    return items[0]["name"] if items else None
+
+
+def _first_name(cell):
+    for m in _PAIR.finditer(cell):
+        if m.group(2) == "name":
+            return _decode(m.group(3))
+    return None
+
+
+def director(cell):
+    """Name of the first crew member whose job is 'Director', or None."""
+    if _is_list_literal(cell):
+        try:
+            return _director(cell)
+        except _DECODE_ERRORS:
+            pass
+    for item in _slow_items(cell):
+        if item.get("job") == "Director":
+            return item.get("name")
+    return None
+
+
+def _director(cell):
+    if "'Director'" not in cell and '"Director"' not in cell:
+        return None
+    job = name = None
+    for m in _PAIR.finditer(cell):
+        if m.group(1) and job == "Director":
+            return name
+        if m.group(1):
+            job = name = None
+        key = m.group(2)
+        if key == "job":
+            job = _decode(m.group(3))
+        elif key == "name":
+            name = _decode(m.group(3))
+    return name if job == "Director" else None
+
+
+def country_codes(cell):
+    """(iso_3166_1, name) of every production country."""
+    if _is_list_literal(cell):
+        try:
+            return _country_codes(cell)
+        except _DECODE_ERRORS:
+            pass
+    return [(d.get("iso_3166_1"), d.get("name")) for d in _slow_items(cell)]
+
+
+def _country_codes(cell):
+    pairs = []
+    code = name = None
+    for m in _PAIR.finditer(cell):
+        if m.group(1):
+            if name is not None:
+                pairs.append((code, name))
+            code = name = None
+        key = m.group(2)
+        if key == "iso_3166_1":
+            code = _decode(m.group(3))
+        elif key == "name":
+            name = _decode(m.group(3))
+    if name is not None:
+        pairs.append((code, name))
+    return pairs
+
+
+# ---------- Column helpers ----------
+def extract_column(series, extractor):
+    return [extractor(cell) for cell in series]
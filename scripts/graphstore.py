@@ -0,0 +1,144 @@
+# scripts/graphstore.py
+
+"""
+A single-file figure store shared by every server process.
+
+One builder (app.py --build-store PATH) writes all responses of a build,
+precompressed, into one file:
+
+    header   magic, index offset, index length
+    bodies   every encoding of every response, back to back
+    index    JSON: version, created, genres and, per URL path,
+             encoding -> [offset, length, etag]
+
+The file is written next to its destination and os.replace()d over it,
+so readers see either the old store or the new one, never a partial
+write. GraphStore maps it read-only: all processes share the same
+page-cache pages instead of each holding its own GRAPHS, bodies are
+memoryview slices of the mapping streamed out in chunks (never copied
+whole), and a store replaced on disk is remapped on the next request.
+"""
+
+import datetime
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+from scripts.payload import EncodedBody
+from scripts.prerender import responses
+
+MAGIC = b"MVGSTOR1"
+HEADER = struct.Struct("<8sQQ")  # magic, index offset, index length
+
+# Bytes handed to the WSGI server per write when streaming a body
+CHUNK = 65536
+
+
+def write_store(path, graphs, templates, genres, version):
+    """
+    Write the responses of `graphs` (the GRAPHS dict) and the genre
+    `templates` to `path`, atomically. Returns the index.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".store-")
+    try:
+        os.chmod(tmp, 0o644)  # mkstemp creates it private; workers may run as another user
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"\0" * HEADER.size)
+            files = {}
+            for url, body in responses(graphs, templates, genres):
+                encoded = EncodedBody(body, version)
+                entry = files[url] = {}
+                for encoding, data in encoded.bodies.items():
+                    entry[encoding or "identity"] = [f.tell(), len(data), encoded.etags[encoding]]
+                    f.write(data)
+            index = {
+                "version": version,
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "genres": list(genres),
+                "files": files,
+            }
+            raw = json.dumps(index).encode("utf-8")
+            offset = f.tell()
+            f.write(raw)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, offset, len(raw)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return index
+
+
+def chunks(view):
+    """A memoryview body as bytes chunks (WSGI servers only accept bytes)."""
+    for start in range(0, len(view), CHUNK):
+        yield bytes(view[start:start + CHUNK])
+
+
+class MappedBody(EncodedBody):
+    """An EncodedBody whose encodings are slices of a mapped store."""
+
+    def __init__(self, view, entry):
+        self.view = view
+        self.spans = {}
+        self.etags = {}
+        for key, (offset, length, etag) in entry.items():
+            encoding = None if key == "identity" else key
+            self.spans[encoding] = (offset, length)
+            self.etags[encoding] = etag
+
+    def body(self, encoding):
+        offset, length = self.spans[encoding]
+        return self.view[offset:offset + length]
+
+
+class _Mapping:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        magic, offset, length = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a graph store")
+        self.index = json.loads(self.map[offset:offset + length])
+        view = memoryview(self.map)
+        self.bodies = {url: MappedBody(view, entry) for url, entry in self.index["files"].items()}
+
+
+class GraphStore:
+    """
+    Read-only view of a store written by write_store(). get() picks up a
+    replaced file before answering, so workers follow rebuilds on their own.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mapping = _Mapping(path)
+
+    def _current(self):
+        mapping = self._mapping
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return mapping
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) != mapping.key:
+            # the old map is closed once no response still holds a slice of it
+            mapping = self._mapping = _Mapping(self.path)
+            print(f"[INFO] Graph store {self.path} remapped (version {mapping.index['version']})")
+        return mapping
+
+    @property
+    def manifest(self):
+        index = self._current().index
+        return {key: index[key] for key in ("version", "created", "genres")}
+
+    def get(self, url):
+        """MappedBody for a URL path, or None."""
+        return self._current().bodies.get(url)
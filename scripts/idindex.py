@@ -0,0 +1,58 @@
+# scripts/idindex.py
+
+"""
+Movie id lookups by binary search over a sorted, deduplicated id array.
+
+Used to join credits/keywords onto movies by `id` (not by row position)
+and to find a single movie without scanning the frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class IdIndex:
+    """
+    Sorted unique ids of a table and the row each one comes from. When an
+    id occurs more than once, its first row wins.
+    """
+
+    def __init__(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        ordered = ids[order]
+        first = np.ones(len(ordered), dtype=bool)
+        first[1:] = ordered[1:] != ordered[:-1]
+        self.ids = ordered[first]
+        self.rows = order[first]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, movie_id):
+        return self.row(movie_id) is not None
+
+    def lookup(self, ids):
+        """Row of each of `ids` in the indexed table, -1 where the id is missing."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(self.ids):
+            return np.full(len(ids), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.ids, ids), len(self.ids) - 1)
+        return np.where(self.ids[pos] == ids, self.rows[pos], -1)
+
+    def row(self, movie_id):
+        """Row of a single id, or None."""
+        row = int(self.lookup([movie_id])[0])
+        return row if row >= 0 else None
+
+    def take(self, values, ids):
+        """
+        Values of a column of the indexed table aligned to `ids`, as a Series
+        (NaN where an id is missing).
+        """
+        rows = self.lookup(ids)
+        values = pd.Series(values).reset_index(drop=True)
+        if not len(values):
+            return pd.Series([np.nan] * len(rows), dtype=object)
+        taken = values.iloc[np.maximum(rows, 0)].reset_index(drop=True)
+        return taken.where(rows >= 0)
@@ -0,0 +1,268 @@
+# scripts/incremental.py
+
+"""
+Aggregates behind every panel, maintained with deltas.
+
+Aggregates.from_tables() builds the counts once from the long-form tables;
+update() then takes only new or corrected movies, subtracts the previous
+version of each changed id, adds the new one and reports which figures
+were affected, so a refresh costs time proportional to the change.
+"""
+
+import math
+from collections import Counter, namedtuple
+
+import pandas as pd
+
+from scripts.model import (
+    DirectorTable, GenreSlice, keywords_per_genre, actors_per_genre, nest_by_genre, rank_counts, ratings,
+)
+from scripts.visualize import (
+    keyword_bar_figure,
+    director_figure,
+    streamgraph_figure,
+    world_map_figure,
+    actor_sunburst_figure,
+)
+
+MovieRow = namedtuple("MovieRow", [
+    "id", "title", "year", "revenue", "vote_average", "top_actor", "director",
+    "genres", "countries", "keywords",
+])
+
+
+def _value(x):
+    # NaN never compares equal, which would make every row look changed
+    if x is None or (isinstance(x, float) and math.isnan(x)):
+        return None
+    return x
+
+
+def movie_rows(movies):
+    """MovieRow per row of a load_data()-shaped frame."""
+    columns = [movies[c].tolist() for c in ["id", "title", "year", "revenue"]]
+    columns += [ratings(movies).tolist()] + [movies[c].tolist() for c in ["top_actor", "director"]]
+    lists = [movies[c].tolist() for c in ["genres_list", "countries", "keywords_list"]]
+    for values in zip(*columns, *lists):
+        scalars = [_value(v) for v in values[:7]]
+        yield MovieRow(*scalars, *(tuple(str(x) for x in lst) for lst in values[7:]))
+
+
+class Aggregates:
+    def __init__(self):
+        self.rows = {}                 # id -> tuple of MovieRow (ids can repeat)
+        self.keywords = Counter()      # keyword -> (genre, keyword) pairs
+        self.genre_keywords = {}       # genre -> Counter(keyword)
+        self.genre_actors = {}         # genre -> Counter(actor)
+        self.actors = Counter()        # actor -> movies with genres
+        self.year_genre = {}           # genre -> {year: [revenue sum, movies]}
+        self.countries = Counter()     # country -> movies
+        self.directors = {}            # director -> [films, revenue sum, n, rating sum, n]
+
+    # ---------- Building ----------
+    @classmethod
+    def from_tables(cls, tables):
+        agg = cls()
+        movies = tables.movies
+        if "genres_list" not in movies:
+            # compact frames keep their lists only in the long-form tables
+            movies = movies.assign(
+                genres_list=tables.list_column(tables.genres, "genre"),
+                countries=tables.list_column(tables.countries, "country"),
+                keywords_list=tables.list_column(tables.keywords, "keyword"),
+            )
+        for row in movie_rows(movies):
+            agg.rows[row.id] = agg.rows.get(row.id, ()) + (row,)
+
+        # the large pair counts come straight from the grouped long-form tables
+        for (g, kw), n in keywords_per_genre(tables).items():
+            agg.genre_keywords.setdefault(str(g), Counter())[str(kw)] = int(n)
+            agg.keywords[str(kw)] += int(n)
+        for (g, actor), n in actors_per_genre(tables).items():
+            agg.genre_actors.setdefault(str(g), Counter())[actor] = int(n)
+        for rows in agg.rows.values():
+            for row in rows:
+                agg._apply_scalars(row, 1)
+        return agg
+
+    def _apply_scalars(self, row, sign):
+        """Everything except the (genre, keyword) and (genre, actor) pair counts."""
+        for g in row.genres if row.year is not None else ():
+            cell = self.year_genre.setdefault(g, {}).setdefault(row.year, [0.0, 0])
+            cell[0] += sign * (row.revenue or 0.0)
+            cell[1] += sign
+            if cell[1] == 0:
+                del self.year_genre[g][row.year]
+
+        for c in row.countries:
+            self.countries[c] += sign
+
+        if row.top_actor is not None and row.genres:
+            self.actors[row.top_actor] += sign
+
+        if row.director is not None:
+            d = self.directors.setdefault(row.director, [0, 0.0, 0, 0.0, 0])
+            d[0] += sign * (row.title is not None)
+            if row.revenue is not None:
+                d[1] += sign * row.revenue
+                d[2] += sign
+            if row.vote_average is not None:
+                d[3] += sign * row.vote_average
+                d[4] += sign
+
+    def _apply(self, row, sign):
+        for g in row.genres:
+            kws = self.genre_keywords.setdefault(g, Counter())
+            for kw in row.keywords:
+                kws[kw] += sign
+                self.keywords[kw] += sign
+            if row.top_actor is not None:
+                self.genre_actors.setdefault(g, Counter())[row.top_actor] += sign
+        self._apply_scalars(row, sign)
+
+    # ---------- Deltas ----------
+    @staticmethod
+    def _inputs(rows):
+        """What each figure reads from these rows, keyed by figure path."""
+        inputs = {}
+        for row in rows:
+            for path, value in [
+                (("panel1",), (row.genres, row.keywords) if row.genres and row.keywords else None),
+                (("panel2",), (row.director, row.title is not None, row.revenue, row.vote_average)
+                 if row.director is not None else None),
+                (("panel3",), (row.year, row.genres, row.revenue) if row.year is not None else None),
+                (("panel4",), row.countries or None),
+                (("panel5",), (row.top_actor, row.genres) if row.top_actor is not None else None),
+            ]:
+                if value is not None:
+                    inputs.setdefault(path, []).append(value)
+            for g in row.genres:
+                if row.keywords:
+                    inputs.setdefault(("genre_panel1", g), []).append(row.keywords)
+                if row.year is not None:
+                    inputs.setdefault(("genre_panel3", g), []).append((row.year, row.revenue))
+                if row.top_actor is not None:
+                    inputs.setdefault(("genre_panel5", g), []).append(row.top_actor)
+        return inputs
+
+    def update(self, movies):
+        """
+        Fold new/changed movies (a load_data()-shaped frame) into the counts.
+        Returns (changed ids, set of dirty figure paths such as ("panel1",)
+        or ("genre_panel3", "Drama")).
+        """
+        incoming = {}
+        for row in movie_rows(movies):
+            incoming[row.id] = incoming.get(row.id, ()) + (row,)
+
+        changed, dirty = [], set()
+        for movie_id, rows in incoming.items():
+            old = self.rows.get(movie_id, ())
+            if old == rows:
+                continue
+            # only figures whose inputs differ (e.g. a new rating leaves panel1 alone)
+            before, after = self._inputs(old), self._inputs(rows)
+            dirty.update(path for path in before.keys() | after.keys() if before.get(path) != after.get(path))
+            for row in old:
+                self._apply(row, -1)
+            for row in rows:
+                self._apply(row, 1)
+            self.rows[movie_id] = rows
+            changed.append(movie_id)
+        self._prune()
+        return changed, dirty
+
+    def _prune(self):
+        for counter in [self.keywords, self.actors, self.countries,
+                        *self.genre_keywords.values(), *self.genre_actors.values()]:
+            for key in [k for k, n in counter.items() if n <= 0]:
+                del counter[key]
+        for name in [d for d, v in self.directors.items() if v[0] <= 0 and v[2] <= 0 and v[4] <= 0]:
+            del self.directors[name]
+        for mapping in (self.genre_keywords, self.genre_actors, self.year_genre):
+            for g in [g for g, v in mapping.items() if not v]:
+                del mapping[g]
+
+    def movie(self, movie_id):
+        """The current version of a movie as a dict (first row for a repeated id), or None."""
+        rows = self.rows.get(movie_id)
+        if not rows:
+            return None
+        return {k: list(v) if isinstance(v, tuple) else v for k, v in rows[0]._asdict().items()}
+
+    def frame(self):
+        """The current movies as a load_data()-shaped frame."""
+        rows = [row for rows in self.rows.values() for row in rows]
+        frame = pd.DataFrame(rows, columns=MovieRow._fields)
+        frame = frame.rename(columns={"genres": "genres_list", "keywords": "keywords_list"})
+        for col in ["genres_list", "countries", "keywords_list"]:
+            frame[col] = frame[col].map(list)
+        return frame[["id", "title", "year", "revenue", "vote_average", "top_actor", "director",
+                      "genres_list", "countries", "keywords_list"]]
+
+    # ---------- Panel inputs ----------
+    @staticmethod
+    def _ranked(counter, n=None):
+        # same order as the table-based path
+        return rank_counts(pd.Series(counter, dtype="int64"), n)
+
+    def genres(self):
+        return sorted(set(self.year_genre) | set(self.genre_keywords))
+
+    def top_keywords(self, n=50):
+        return self._ranked(self.keywords, n)
+
+    def director_stats(self):
+        rows = [
+            (name, d[3] / d[4] if d[4] else float("nan"), d[1] / d[2] if d[2] else float("nan"), d[0])
+            for name, d in sorted(self.directors.items())
+        ]
+        frame = pd.DataFrame(rows, columns=["director", "vote_average", "revenue", "title"])
+        return frame.dropna().reset_index(drop=True)
+
+    def genre_year_revenue(self):
+        rows = [(year, g, cell[0]) for g, years in self.year_genre.items() for year, cell in years.items()]
+        frame = pd.DataFrame(rows, columns=["year", "genre", "revenue"])
+        return frame.sort_values(["year", "genre"]).reset_index(drop=True)
+
+    def country_counts(self):
+        return self._ranked(self.countries)
+
+    def top_actors_by_genre(self, top=30):
+        top_names = self._ranked(self.actors, top).index
+        names = set(top_names)
+        pairs = (
+            ((g, actor), n)
+            for g, counter in self.genre_actors.items()
+            for actor, n in counter.items() if actor in names
+        )
+        return nest_by_genre(pairs, top_names)
+
+    def genre_slice(self, g, top_keywords=25, top_actors=30):
+        years = self.year_genre.get(g, {})
+        revenue = pd.Series({y: cell[0] for y, cell in sorted(years.items())}, dtype="float64")
+        return GenreSlice(
+            self._ranked(self.genre_keywords.get(g, {}), top_keywords),
+            self._ranked(self.genre_actors.get(g, {}), top_actors),
+            revenue,
+        )
+
+    def breakdown(self):
+        return {g: self.genre_slice(g) for g in self.genres()}
+
+
+# ---------- Figures ----------
+def aggregates_figure(agg, name):
+    """JSON of panel1–panel5 built from maintained aggregates."""
+    if name == "panel1":
+        return keyword_bar_figure(agg.top_keywords(50))
+    if name == "panel2":
+        _, directors = DirectorTable(agg.director_stats()).page("revenue", limit=100)
+        return director_figure(directors)
+    if name == "panel3":
+        return streamgraph_figure(agg.genre_year_revenue())
+    if name == "panel4":
+        return world_map_figure(agg.country_counts())
+    if name == "panel5":
+        return actor_sunburst_figure(agg.top_actors_by_genre(30))
+    raise KeyError(name)
@@ -0,0 +1,211 @@
+# scripts/metrics.py
+
+"""
+Lightweight per-stage instrumentation.
+
+@instrument("name") records, for every call: wall time, CPU time, the
+growth of the process' peak RSS, rows in and serialized bytes out.
+Totals per stage are exposed by snapshot() / prometheus() (served on
+/metrics). Set PROFILE_DIR to also dump a cProfile file per call.
+"""
+
+import cProfile
+import functools
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# When set, every outermost instrumented call is profiled into this directory
+PROFILE_DIR = None
+
+_lock = threading.Lock()
+_stages = {}
+_events = deque(maxlen=1000)
+_seq = itertools.count()
+_local = threading.local()
+
+
+# A process forked while another thread holds _lock (build_graphs forks its
+# pool from a request or build thread) would inherit it locked forever: hold
+# it across fork() and give the child a fresh one.
+def _before_fork():
+    _lock.acquire()
+
+
+def _after_fork_in_parent():
+    _lock.release()
+
+
+def _after_fork_in_child():
+    global _lock
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):  # not available on Windows
+    os.register_at_fork(before=_before_fork, after_in_parent=_after_fork_in_parent,
+                        after_in_child=_after_fork_in_child)
+
+
+# ---------- Memory ----------
+def peak_rss_bytes():
+    """Peak resident set size of this process so far (0 if unknown)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def peak_rss_mb():
+    return peak_rss_bytes() / (1 << 20)
+
+
+# ---------- Sizes ----------
+def _rows(args, result):
+    for candidate in (args[0] if args else None, result):
+        if candidate is not None and not isinstance(candidate, (str, bytes)) and hasattr(candidate, "__len__"):
+            return len(candidate)
+    return None
+
+
+def serialized_bytes(result):
+    """Bytes of serialized output: JSON strings, or dicts/tuples of them."""
+    if isinstance(result, (str, bytes)):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(serialized_bytes(v) for v in result.values())
+    if isinstance(result, (list, tuple)):
+        return sum(serialized_bytes(v) for v in result)
+    length = getattr(result, "content_length", None)  # flask Response
+    return length or 0
+
+
+# ---------- Recording ----------
+def record(stage, wall, cpu, rss_delta=0, rows=None, nbytes=0):
+    event = {
+        "stage": stage,
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "rss_delta_bytes": rss_delta,
+        "rows": rows,
+        "bytes": nbytes,
+        "pid": os.getpid(),
+        "time": time.time(),
+    }
+    add_events([event])
+
+
+def add_events(events):
+    """
+    Fold events into the per-stage totals (also used for events from worker
+    processes). Each event is numbered here: forked workers inherit _seq,
+    so their own numbers would repeat the parent's.
+    """
+    with _lock:
+        for event in events:
+            event = dict(event, seq=next(_seq))
+            _events.append(event)
+            s = _stages.setdefault(event["stage"], {
+                "calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                "rss_delta_bytes": 0, "bytes": 0, "last": None,
+            })
+            s["calls"] += 1
+            s["wall_seconds"] += event["wall_seconds"]
+            s["cpu_seconds"] += event["cpu_seconds"]
+            s["rss_delta_bytes"] += event["rss_delta_bytes"]
+            s["bytes"] += event["bytes"]
+            s["last"] = event
+
+
+def mark():
+    """Sequence number to pass to events_since()."""
+    with _lock:
+        return _events[-1]["seq"] + 1 if _events else 0
+
+
+def events_since(seq):
+    with _lock:
+        return [e for e in _events if e["seq"] >= seq]
+
+
+def instrument(stage, rows=_rows, size=serialized_bytes):
+    """
+    Decorator recording every call of the wrapped function as `stage`.
+    `rows(args, result)` and `size(result)` measure a call; pass None for
+    either to record no rows / 0 bytes.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            depth = getattr(_local, "depth", 0)
+            profiler = None
+            if PROFILE_DIR and depth == 0:
+                profiler = cProfile.Profile()
+                profiler.enable()
+            _local.depth = depth + 1
+
+            rss_before = peak_rss_bytes()
+            cpu_start = time.process_time()
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                _local.depth = depth
+                if profiler is not None:
+                    profiler.disable()
+                    os.makedirs(PROFILE_DIR, exist_ok=True)
+                    profiler.dump_stats(os.path.join(
+                        PROFILE_DIR, f"{stage.replace('/', '_')}-{os.getpid()}-{int(time.time() * 1000)}.prof"
+                    ))
+            record(
+                stage,
+                wall=time.perf_counter() - start,
+                cpu=time.process_time() - cpu_start,
+                rss_delta=peak_rss_bytes() - rss_before,
+                rows=rows(args, result) if rows else None,
+                nbytes=size(result) if size else 0,
+            )
+            return result
+        return wrapper
+    return decorator
+
+
+# ---------- Export ----------
+def snapshot():
+    with _lock:
+        return {
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": {name: dict(s) for name, s in _stages.items()},
+        }
+
+
+def prometheus():
+    """Totals in the Prometheus text exposition format."""
+    snap = snapshot()
+    metrics = [
+        ("dashboard_stage_calls_total", "counter", "calls", lambda s: s["calls"]),
+        ("dashboard_stage_wall_seconds_total", "counter", "wall time", lambda s: s["wall_seconds"]),
+        ("dashboard_stage_cpu_seconds_total", "counter", "CPU time", lambda s: s["cpu_seconds"]),
+        ("dashboard_stage_rss_delta_bytes_total", "counter", "peak RSS growth", lambda s: s["rss_delta_bytes"]),
+        ("dashboard_stage_bytes_total", "counter", "serialized output bytes", lambda s: s["bytes"]),
+        ("dashboard_stage_last_wall_seconds", "gauge", "wall time of the last call", lambda s: s["last"]["wall_seconds"]),
+        ("dashboard_stage_last_rows", "gauge", "rows processed by the last call", lambda s: s["last"]["rows"] or 0),
+    ]
+    lines = []
+    for name, kind, help_text, value in metrics:
+        lines.append(f"# HELP {name} Pipeline stage {help_text}.")
+        lines.append(f"# TYPE {name} {kind}")
+        for stage, s in sorted(snap["stages"].items()):
+            lines.append(f'{name}{{stage="{stage}"}} {value(s)}')
+    lines.append("# HELP dashboard_peak_rss_bytes Peak resident set size of the process.")
+    lines.append("# TYPE dashboard_peak_rss_bytes gauge")
+    lines.append(f"dashboard_peak_rss_bytes {snap['peak_rss_bytes']}")
+    return "\n".join(lines) + "\n"
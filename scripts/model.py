@@ -0,0 +1,314 @@
+# scripts/model.py
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.topk import top_k, grouped_top_k
+
+# Decimals a float32 rating is exact to (float32 spacing below 16 is < 1e-6)
+RATING_DECIMALS = 4
+
+
+# ---------- Long-form tables ----------
+class MovieTables:
+    """
+    The merged movies frame plus normalized long-form tables, built once and
+    shared by every panel:
+      genres    (movie, genre)
+      keywords  (movie, keyword)
+      countries (movie, country)
+    `movie` is the int32 row position in `movies`; names are categoricals
+    with sorted categories, so groupby output comes out in name order.
+    """
+
+    def __init__(self, movies, genres, keywords, countries):
+        self.movies = movies
+        self.genres = genres
+        self.keywords = keywords
+        self.countries = countries
+        self.n_genres = np.bincount(genres["movie"], minlength=len(movies))
+
+    def __len__(self):
+        return len(self.movies)
+
+    def movie(self, row):
+        """
+        The movie at `row` as plain Python values, with the same keys as
+        incremental.MovieRow. Lists are sliced out of the long-form tables
+        by binary search on their (sorted) movie column.
+        """
+        movie = self.movies.iloc[row]
+        record = {}
+        for col in ["id", "title", "year", "revenue", "vote_average", "top_actor", "director"]:
+            value = movie[col]
+            value = value.item() if hasattr(value, "item") else value
+            record[col] = None if pd.isna(value) else value
+        if record["vote_average"] is not None:
+            record["vote_average"] = float(ratings(self.movies.iloc[row:row + 1])[0])
+        for key, table, name in [("genres", self.genres, "genre"),
+                                 ("countries", self.countries, "country"),
+                                 ("keywords", self.keywords, "keyword")]:
+            start, stop = np.searchsorted(table["movie"].to_numpy(), [row, row + 1])
+            record[key] = table[name].iloc[start:stop].astype(str).tolist()
+        return record
+
+    def list_column(self, table, name):
+        """Per-movie Python lists rebuilt from a long-form table, e.g. list_column(tables.genres, "genre")."""
+        offsets = np.zeros(len(self.movies) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(table["movie"], minlength=len(self.movies)), out=offsets[1:])
+        values = table[name].astype(str).tolist()
+        return [values[a:b] for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def long_form(lists, name):
+    """Explode a column of lists into a (movie, name) table."""
+    exploded = pd.Series(lists.to_numpy(), index=np.arange(len(lists), dtype=np.int32)).explode().dropna()
+    values = exploded.astype(str)
+    return pd.DataFrame({
+        "movie": exploded.index.to_numpy(dtype=np.int32),
+        name: pd.Categorical(values, categories=sorted(values.unique())),
+    })
+
+
+def packed_long_form(offsets, codes, categories, name):
+    """(movie, name) table straight from pack_lists() arrays, without Python lists."""
+    order = np.argsort(categories.astype(str), kind="stable")
+    rank = np.empty(len(categories), dtype=np.int32)
+    rank[order] = np.arange(len(categories), dtype=np.int32)
+    return pd.DataFrame({
+        "movie": np.repeat(np.arange(len(offsets) - 1, dtype=np.int32), np.diff(offsets)),
+        name: pd.Categorical.from_codes(rank[codes], categories=categories[order].astype(str)),
+    })
+
+
+def build_tables(movies, lists=None):
+    """
+    MovieTables from a load_data() frame, or from a load_compact() frame
+    plus its packed `lists`.
+    """
+    movies = movies.reset_index(drop=True)
+    if lists is not None:
+        return MovieTables(
+            movies,
+            packed_long_form(*lists["genres_list"], "genre"),
+            packed_long_form(*lists["keywords_list"], "keyword"),
+            packed_long_form(*lists["countries"], "country"),
+        )
+    return MovieTables(
+        movies,
+        long_form(movies["genres_list"], "genre"),
+        long_form(movies["keywords_list"], "keyword"),
+        long_form(movies["countries"], "country"),
+    )
+
+
+def ratings(movies):
+    """
+    vote_average as float64. Compact frames hold it as float32, which
+    widens to 3.799999952316284 for 3.8; those values are rounded back to
+    the (at most 4-decimal) ratings they were parsed from.
+    """
+    values = movies["vote_average"].to_numpy(dtype=np.float64)
+    if movies["vote_average"].dtype == np.float32:
+        values = values.round(RATING_DECIMALS)
+    return values
+
+
+# ---------- Aggregates ----------
+def keyword_counts(tables):
+    """
+    Number of (genre, keyword) pairs per keyword, i.e. every keyword of a movie
+    counted once for each of its genres. Indexed by keyword name.
+    """
+    kw = tables.keywords
+    weights = tables.n_genres[kw["movie"].to_numpy()]
+    counts = pd.Series(weights, index=kw["keyword"]).groupby(level=0, observed=True).sum()
+    return counts[counts > 0]
+
+
+def top_keywords(tables, n=50):
+    """The `n` keywords of keyword_counts() with the most pairs, counted by scripts.topk."""
+    kw = tables.keywords
+    weights = tables.n_genres[kw["movie"].to_numpy()]
+    return top_k(kw["keyword"].cat.codes.to_numpy(), kw["keyword"].cat.categories, n, weights=weights)
+
+
+def keywords_per_genre(tables):
+    """Keyword counts within each genre, indexed by (genre, keyword)."""
+    pairs = tables.genres.merge(tables.keywords, on="movie")
+    return pairs.groupby(["genre", "keyword"], observed=True).size()
+
+
+def actors_per_genre(tables):
+    """Movies per top actor within each genre, indexed by (genre, actor)."""
+    pairs = tables.genres.assign(actor=tables.movies["top_actor"].to_numpy()[tables.genres["movie"]])
+    pairs = pairs.dropna(subset=["actor"])
+    return pairs.groupby(["genre", "actor"], observed=True).size()
+
+
+def genre_year_revenue(tables):
+    """Revenue summed per (year, genre), as a long (year, genre, revenue) frame."""
+    movies = tables.movies
+    rows = tables.genres.assign(
+        year=movies["year"].to_numpy()[tables.genres["movie"]],
+        revenue=movies["revenue"].to_numpy()[tables.genres["movie"]],
+    )
+    return rows.groupby(["year", "genre"], observed=True)["revenue"].sum().reset_index()
+
+
+def country_counts(tables):
+    """Movies per production country, most frequent first."""
+    counts = tables.countries["country"].value_counts()
+    return counts[counts > 0]
+
+
+def director_stats(movies):
+    """Mean rating, mean revenue and film count per director (directors with no data dropped)."""
+    movies = movies.assign(vote_average=ratings(movies))
+    return movies.groupby("director").agg({
+        "vote_average": "mean",
+        "revenue": "mean",
+        "title": "count"
+    }).dropna().reset_index()
+
+
+class DirectorTable:
+    """
+    director_stats() kept for the life of the dataset, with row orders for
+    every sort key computed once, so any page of any ranking is a slice.
+    Ties are broken by director name.
+    """
+
+    # API name -> column
+    SORT_KEYS = {"revenue": "revenue", "rating": "vote_average", "films": "films"}
+
+    def __init__(self, stats):
+        stats = stats.rename(columns={"title": "films"}).sort_values("director", kind="stable")
+        self.stats = stats.reset_index(drop=True)
+        self.films = self.stats["films"].to_numpy()
+        names = np.arange(len(self.stats))
+        self.orders = {}
+        for key, col in self.SORT_KEYS.items():
+            values = self.stats[col].to_numpy()
+            self.orders[(key, True)] = np.lexsort((names, -values))
+            self.orders[(key, False)] = np.lexsort((names, values))
+
+    def __len__(self):
+        return len(self.stats)
+
+    def page(self, sort="revenue", descending=True, offset=0, limit=100, min_films=1):
+        """
+        (total, rows): the directors with at least `min_films` films ranked
+        by `sort`, and rows offset..offset+limit of that ranking with a
+        1-based `rank` column.
+        """
+        order = self.orders[(sort, descending)]
+        if min_films > 1:
+            order = order[self.films[order] >= min_films]
+        rows = self.stats.iloc[order[offset:offset + limit]].reset_index(drop=True)
+        rows.insert(0, "rank", np.arange(offset + 1, offset + 1 + len(rows)))
+        return len(order), rows
+
+
+def top_actors_by_genre(tables, top=30):
+    """
+    The `top` actors by number of movies (movies without genres are ignored),
+    broken down by genre: {genre: {actor: count}} with genres sorted and
+    actors in rank order. Ties are broken by name.
+    """
+    movies = tables.movies
+    actor = movies["top_actor"].to_numpy()
+    has_actor = movies["top_actor"].notna().to_numpy() & (tables.n_genres > 0)
+
+    codes, names = pd.factorize(actor[has_actor], sort=True)
+    top_names = top_k(codes, names, top).index
+
+    pairs = tables.genres.assign(actor=actor[tables.genres["movie"]])
+    pairs = pairs[pairs["actor"].isin(top_names)]
+    pairs = pairs.assign(genre=pairs["genre"].astype(str))
+    grouped = pairs.groupby(["genre", "actor"]).size()
+
+    return nest_by_genre(grouped.items(), top_names)
+
+
+def rank_counts(counts, n=None):
+    """The `n` largest counts (all if None), largest first, ties broken by name."""
+    ranked = counts.sort_index().sort_values(ascending=False, kind="stable")
+    return ranked if n is None else ranked.head(n)
+
+
+def nest_by_genre(pairs, ranked_names):
+    """{genre: {name: count}} from ((genre, name), count) pairs, names in `ranked_names` order."""
+    rank = {name: i for i, name in enumerate(ranked_names)}
+    result = {}
+    for (genre, name), count in pairs:
+        result.setdefault(genre, {})[name] = int(count)
+    return {
+        g: dict(sorted(result[g].items(), key=lambda kv: rank[kv[0]]))
+        for g in sorted(result)
+    }
+
+
+# ---------- Per-genre breakdown ----------
+# keywords/actors: Series name -> count, largest first; revenue: Series year -> revenue sum
+GenreSlice = namedtuple("GenreSlice", ["keywords", "actors", "revenue"])
+
+
+def genre_keyword_chunks(tables, movies=4096):
+    """
+    (genre codes, keyword codes) of every (genre, keyword) pair, as int
+    array chunks covering `movies` movies each, expanded from the
+    movie-sorted long-form tables without a merge or a full pair array.
+    """
+    genre_movie = tables.genres["movie"].to_numpy()
+    genre_codes = tables.genres["genre"].cat.codes.to_numpy()
+    kw_movie = tables.keywords["movie"].to_numpy()
+    kw_codes = tables.keywords["keyword"].cat.codes.to_numpy()
+    for a in range(0, len(tables.movies), movies):
+        b = min(a + movies, len(tables.movies))
+        g0, g1 = np.searchsorted(genre_movie, [a, b])
+        k0, k1 = np.searchsorted(kw_movie, [a, b])
+        kw_offsets = np.zeros(b - a + 1, dtype=np.int64)
+        np.cumsum(np.bincount(kw_movie[k0:k1] - a, minlength=b - a), out=kw_offsets[1:])
+
+        rows = genre_movie[g0:g1] - a
+        starts = kw_offsets[rows]
+        lengths = kw_offsets[rows + 1] - starts
+        # positions starts[i] .. starts[i] + lengths[i] - 1 for every genre row i
+        first = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths)
+        positions = first + np.arange(lengths.sum())
+        yield np.repeat(genre_codes[g0:g1], lengths), kw_codes[k0:k1][positions]
+
+
+def genre_breakdown(tables, top_keywords=25, top_actors=30):
+    """
+    Top keywords, top actors and revenue per year for every genre, computed
+    in one pass over the long-form tables. Returns {genre: GenreSlice},
+    genres sorted by name.
+    """
+    genre_names = tables.genres["genre"].cat.categories
+    keywords = grouped_top_k(
+        genre_keyword_chunks(tables), len(genre_names),
+        tables.keywords["keyword"].cat.categories, top_keywords,
+    )
+
+    actor_codes, actor_names = pd.factorize(tables.movies["top_actor"].to_numpy(), sort=True)
+    pair_actors = actor_codes[tables.genres["movie"].to_numpy()]
+    has_actor = pair_actors >= 0
+    actors = grouped_top_k(
+        [(tables.genres["genre"].cat.codes.to_numpy()[has_actor], pair_actors[has_actor])],
+        len(genre_names), actor_names, top_actors,
+    )
+    revenue = genre_year_revenue(tables).pivot(index="year", columns="genre", values="revenue")
+
+    empty = pd.Series(dtype="int64")
+    result = {}
+    for code, genre in enumerate(genre_names):
+        result[genre] = GenreSlice(
+            keywords.get(code, empty),
+            actors.get(code, empty),
+            revenue[genre].dropna() if genre in revenue.columns else pd.Series(dtype="float64"),
+        )
+    return result
@@ -0,0 +1,127 @@
+# scripts/payload.py
+
+"""
+Response bodies built from figures that are already serialized.
+
+Panel functions return `fig.to_json()` strings. Passing those to jsonify()
+escapes every figure into a JSON string inside the response, which the
+browser then has to JSON.parse a second time. assemble() splices the
+figure JSON into the document as-is instead.
+"""
+
+import gzip
+import hashlib
+import json
+
+try:
+    import orjson
+except ImportError:  # optional; plotly also picks it up for fig.to_json()
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+
+def dumps(obj):
+    """Serialize plain data (not figures) to UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _write(node, parts):
+    if isinstance(node, dict):
+        parts.append("{")
+        for i, (key, value) in enumerate(node.items()):
+            if i:
+                parts.append(",")
+            parts.append(json.dumps(str(key)))
+            parts.append(":")
+            _write(value, parts)
+        parts.append("}")
+    else:
+        # a figure already serialized by fig.to_json()
+        parts.append(node)
+
+
+def assemble(graphs):
+    """
+    One JSON document from a (nested) dict whose leaves are figure JSON
+    strings, e.g. GRAPHS. The figures are embedded verbatim, not re-encoded.
+    """
+    parts = []
+    _write(graphs, parts)
+    return "".join(parts).encode("utf-8")
+
+
+# ---------- Template + data figures ----------
+def _merge(base, patch):
+    if isinstance(base, dict) and isinstance(patch, dict) and "bdata" not in patch:
+        merged = dict(base)
+        for key, value in patch.items():
+            merged[key] = _merge(base[key], value) if key in base else value
+        return merged
+    return patch
+
+
+def merge_figure(template, patch):
+    """
+    The full figure JSON (bytes) for a data-only `patch` of a panel
+    `template` (both JSON). Dicts merge recursively, traces merge by
+    position, any other value (arrays, typed arrays) replaces the
+    template's; the patch decides how many traces there are. A patch
+    without "base" is a complete figure already.
+    """
+    patch = json.loads(patch)
+    if "base" not in patch:
+        return dumps(patch)
+    figure = json.loads(template)
+    patch.pop("base")
+    bases = figure["data"]
+    figure["data"] = [_merge(bases[i], trace) if i < len(bases) else trace for i, trace in enumerate(patch.pop("data", []))]
+    return dumps(_merge(figure, patch))
+
+
+# ---------- Precompressed bodies ----------
+class EncodedBody:
+    """
+    A response body kept ready in identity, gzip and (with the brotli package)
+    br encodings, each with its own strong ETag derived from `version` and
+    the body's hash.
+    """
+
+    def __init__(self, body, version):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        base = f"{version}-{hashlib.sha1(body).hexdigest()[:16]}"
+        self.bodies = {None: body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body)
+        self.etags = {enc: base if enc is None else f"{base}-{enc}" for enc in self.bodies}
+
+    def negotiate(self, accept_encodings):
+        """Smallest encoding the client accepts (None = identity)."""
+        for enc in ("br", "gzip"):
+            if enc in self.etags and accept_encodings[enc]:
+                return enc
+        return None
+
+    def body(self, encoding):
+        return self.bodies[encoding]
+
+
+class FileBody(EncodedBody):
+    """
+    An EncodedBody written to disk by scripts.prerender: the ETags are kept
+    in memory, the bodies are read from their files when sent.
+    """
+
+    def __init__(self, files, etags):
+        self.files = files  # encoding -> path
+        self.etags = etags
+
+    def body(self, encoding):
+        with open(self.files[encoding], "rb") as f:
+            return f.read()
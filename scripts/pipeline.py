@@ -0,0 +1,171 @@
+# scripts/pipeline.py
+
+import glob
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import plotly.graph_objects as go
+
+from scripts import metrics
+from scripts.model import genre_breakdown
+from scripts.visualize import (
+    panel1_genre_keyword,
+    panel2_director_matrix,
+    panel3_streamgraph,
+    panel4_global_map,
+    panel5_actor_genre_network,
+    genre_figures,
+    genre_keyword_data,
+    genre_actor_data,
+    genre_revenue_data,
+    TEAL_PALETTE,
+)
+
+PANELS = {
+    "panel1": panel1_genre_keyword,
+    "panel2": panel2_director_matrix,
+    "panel3": panel3_streamgraph,
+    "panel4": panel4_global_map,
+    "panel5": panel5_actor_genre_network,
+}
+
+# Genre-specific data payloads, in the order genre_figures() returns them
+GENRE_PANELS = ["genre_panel1", "genre_panel5", "genre_panel3"]
+
+# Panels that have a genre-specific version
+GENRE_FIGURES = ["panel1", "panel3", "panel5"]
+
+def _code_version():
+    # figures depend on every module in scripts/, so hash them all
+    h = hashlib.sha1()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(__file__), "*.py"))):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:12]
+
+CODE_VERSION = _code_version()
+
+# Set in the parent right before the pool forks, so workers inherit the
+# tables instead of receiving a pickled copy with every task.
+_SHARED = {}
+
+
+# ---------- Single figures ----------
+def panel_figure(tables, name):
+    """JSON of one of panel1–panel5."""
+    return PANELS[name](tables.movies, tables)
+
+
+def genre_panel_data(breakdown, name, g):
+    """
+    Data payload of the genre-specific version of `name` (panel1, panel3 or
+    panel5) for genre `g`; payload.merge_figure() with genre_templates()[name]
+    turns it into the figure.
+    """
+    data = breakdown[g]
+    if name == "panel1":
+        return genre_keyword_data(g, data.keywords)
+    if name == "panel3":
+        return genre_revenue_data(g, data.revenue)
+    if name == "panel5":
+        i = list(breakdown).index(g)
+        return genre_actor_data(g, data.actors, TEAL_PALETTE[i % len(TEAL_PALETTE)])
+    raise KeyError(name)
+
+
+# ---------- Tasks ----------
+def _tasks(breakdown):
+    tasks = [(name, name, ()) for name in PANELS]
+    for i, g in enumerate(breakdown):
+        tasks.append((("genre", g), "genre", (g, i)))
+    return tasks
+
+
+def _run_task(key, kind, args):
+    seq = metrics.mark()
+    start = time.perf_counter()
+    tables = _SHARED["tables"]
+    if kind == "genre":
+        g, i = args
+        result = genre_figures(g, i, _SHARED["breakdown"][g])
+    else:
+        result = panel_figure(tables, kind)
+    # metrics recorded during the task, shipped back when it ran in a worker
+    return key, result, time.perf_counter() - start, metrics.events_since(seq)
+
+
+def _collect(graphs, key, result, elapsed):
+    if isinstance(key, tuple):
+        _, g = key
+        for name, fig in zip(GENRE_PANELS, result):
+            graphs[name][g] = fig
+        label = f"genre '{g}'"
+    else:
+        graphs[key] = result
+        label = key
+    print(f"[INFO] Built {label} in {elapsed:.2f}s")
+
+
+# ---------- Batch ----------
+def _warm_plotly():
+    # Plotly imports its validators lazily on first use; do it once in the
+    # parent so forked workers don't each pay for it.
+    fig = go.Figure([go.Bar(), go.Scatter(), go.Sunburst(), go.Choropleth()])
+    fig.update_layout(geo=dict(showframe=False), legend=dict(title=dict(text="")))
+    fig.to_json()
+
+
+def fork_available():
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def build_graphs(tables, workers=1, progress=None, breakdown=None):
+    """
+    Build panel1–panel5 and every genre-specific figure.
+    With workers > 1 the figures are built in a forked process pool that
+    inherits `tables`; otherwise (or where fork is unavailable) one by one.
+    `progress(done, total)` is called after every finished task.
+    Returns the dict app.run_batch stores as GRAPHS.
+    """
+    breakdown = breakdown if breakdown is not None else genre_breakdown(tables)
+    graphs = {name: {} for name in GENRE_PANELS}
+    tasks = _tasks(breakdown)
+
+    _SHARED["tables"] = tables
+    _SHARED["breakdown"] = breakdown
+    try:
+        if workers > 1 and not fork_available():
+            print("[INFO] fork is not available here, building panels sequentially.")
+            workers = 1
+
+        if workers <= 1:
+            results = (_run_task(*task) for task in tasks)
+        else:
+            _warm_plotly()
+            ctx = multiprocessing.get_context("fork")
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+            futures = [pool.submit(_run_task, *task) for task in tasks]
+            results = (future.result() for future in as_completed(futures))
+
+        try:
+            for done, (key, result, elapsed, events) in enumerate(results, 1):
+                if workers > 1:
+                    # worker-side metrics don't reach this process otherwise
+                    metrics.add_events(events)
+                _collect(graphs, key, result, elapsed)
+                if progress:
+                    progress(done, len(tasks))
+        finally:
+            if workers > 1:
+                pool.shutdown(cancel_futures=True)
+    finally:
+        _SHARED.clear()
+
+    # keep panel/genre order stable regardless of completion order
+    ordered = {name: graphs[name] for name in PANELS}
+    for name in GENRE_PANELS:
+        ordered[name] = {g: graphs[name][g] for g in breakdown}
+    return ordered
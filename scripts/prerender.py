@@ -0,0 +1,122 @@
+# scripts/prerender.py
+
+"""
+Static builds: every response of the dashboard written to disk once.
+
+write_build() stores each figure, the combined /get_graphs document and
+the genre list as .json, .json.gz and .json.br files laid out like the
+URLs they answer (graphs/panel1.json, graphs/panel1/template.json,
+graphs/panel1/genre/Drama.json, graphs/panel1/genre/Drama/data.json, ...)
+plus manifest.json, which maps each URL to its files and ETags, and a
+copy of the page (index.html) and its static/ assets. Files are named
+<URL>.json because /graphs/panel1 and /graphs/panel1/template can't both
+be files; a static host maps the URL to it (nginx: try_files $uri.json,
+see the README). StaticBuild serves a build back as FileBody objects, so a server can
+answer from it without pandas, the CSVs or the pipeline.
+"""
+
+import datetime
+import json
+import os
+import shutil
+import tempfile
+from urllib.parse import quote
+
+from scripts.payload import assemble, dumps, merge_figure, EncodedBody, FileBody
+
+MANIFEST = "manifest.json"
+
+# The page and its assets, copied into every build so that it is a whole site
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+PAGE = os.path.join(ROOT, "templates", "index.html")
+ASSETS = os.path.join(ROOT, "static")
+
+# encoding -> file suffix; None is the identity encoding
+SUFFIXES = {None: "", "gzip": ".gz", "br": ".br"}
+
+
+def responses(graphs, templates, genres):
+    """(URL path, body) of every response the build answers."""
+    yield "/get_graphs", assemble(dict(graphs, templates=templates))
+    yield "/genres", dumps(list(genres))
+    for panel, template in templates.items():
+        yield f"/graphs/{panel}/template", template
+    for name, value in graphs.items():
+        if isinstance(value, dict):
+            panel = name[len("genre_"):]
+            for g, payload in value.items():
+                yield f"/graphs/{panel}/genre/{g}/data", payload
+                yield f"/graphs/{panel}/genre/{g}", merge_figure(templates[panel], payload)
+        else:
+            yield f"/graphs/{name}", value
+
+
+def _file_name(url):
+    # genre names may hold spaces or slashes; keep one file per URL
+    parts = url.strip("/").split("/")
+    return "/".join(quote(part, safe=" '") for part in parts) + ".json"
+
+
+def write_build(out_dir, graphs, templates, genres, version):
+    """
+    Write a static build of `graphs` (the GRAPHS dict) and the genre
+    `templates` to `out_dir`, replacing any previous build there.
+    Returns the manifest.
+    """
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix=".build-")
+    os.chmod(tmp, 0o755)  # mkdtemp creates it private; the web server may run as another user
+
+    files = {}
+    for url, body in responses(graphs, templates, genres):
+        encoded = EncodedBody(body, version)
+        name = _file_name(url)
+        entry = {"etags": {}, "bytes": {}}
+        for encoding, data in encoded.bodies.items():
+            key = encoding or "identity"
+            path = os.path.join(tmp, name + SUFFIXES[encoding])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+            entry["etags"][key] = encoded.etags[encoding]
+            entry["bytes"][key] = len(data)
+        entry["path"] = name
+        files[url] = entry
+
+    manifest = {
+        "version": version,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "genres": list(genres),
+        "files": files,
+    }
+    with open(os.path.join(tmp, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=1)
+    shutil.copy(PAGE, os.path.join(tmp, "index.html"))
+    shutil.copytree(ASSETS, os.path.join(tmp, "static"))
+
+    # swap the finished build in; a reader never sees a half-written one
+    old = None
+    if os.path.exists(out_dir):
+        old = tempfile.mkdtemp(dir=parent, prefix=".old-")
+        os.rename(out_dir, os.path.join(old, "build"))
+    os.rename(tmp, out_dir)
+    if old:
+        shutil.rmtree(old)
+    return manifest
+
+
+class StaticBuild:
+    """A build written by write_build(): its manifest and get(URL path) -> FileBody."""
+
+    def __init__(self, out_dir):
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.bodies = {}
+        for url, entry in self.manifest["files"].items():
+            etags = {None if key == "identity" else key: etag for key, etag in entry["etags"].items()}
+            files = {enc: os.path.join(out_dir, entry["path"] + SUFFIXES[enc]) for enc in etags}
+            self.bodies[url] = FileBody(files, etags)
+
+    def get(self, url):
+        return self.bodies.get(url)
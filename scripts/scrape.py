@@ -2,7 +2,28 @@
 
 import pandas as pd
 import ast
+import hashlib
 import os
+import sys
+
+from scripts.cache import fingerprint, read_cache, write_cache, pack_lists, unpack_lists, CACHE_VERSION
+from scripts import countries, extract
+from scripts.idindex import IdIndex
+from scripts.metrics import instrument, peak_rss_mb
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+SOURCES = ["movies_metadata.csv", "credits.csv", "keywords.csv"]
+
+# Columns of the cleaned + merged frame returned by load_data()
+SCALAR_COLUMNS = ["id", "title", "year", "revenue", "vote_average", "top_actor", "director"]
+LIST_COLUMNS = ["genres_list", "countries", "keywords_list"]
+
+# Columns of movies_metadata.csv the dashboard uses; the rest (overview,
+# tagline, ...) is never read
+METADATA_COLUMNS = ["genres", "id", "production_countries", "release_date", "revenue", "title", "vote_average"]
+
+# Rows per chunk when streaming credits.csv / keywords.csv
+CHUNKSIZE = 2000
 
 # ---------- Parsing helpers ----------
 def parse_json(x):
@@ -11,29 +32,223 @@ def parse_json(x):
     except:
         return []
 
+# The list columns only need the 'name' field, which scripts.extract pulls
+# out of the raw strings without evaluating them.
 def parse_genres(entry):
-    items = parse_json(entry)
-    return [d["name"] for d in items] if isinstance(items, list) else []
+    return extract.names(entry)
 
 def parse_keywords(entry):
-    items = parse_json(entry)
-    return [d["name"] for d in items] if isinstance(items, list) else []
+    return extract.names(entry)
 
 def parse_countries(entry):
-    items = parse_json(entry)
-    return [d["name"] for d in items] if isinstance(items, list) else []
+    return extract.names(entry)
 
 
 # ---------- Load datasets ----------
-def load_data():
-    print("[INFO] Loading TMDB datasets...")
+@instrument("load_data", rows=lambda args, result: len(result), size=None)
+def load_data(data_dir=None, use_cache=True, chunksize=CHUNKSIZE):
+    """
+    Load, clean and merge the TMDB CSVs.
+    With `use_cache` the result is kept in data/.cache/ and reused until one of
+    the source CSVs changes (size, mtime and sha1 are checked).
+    credits.csv and keywords.csv are streamed `chunksize` rows at a time
+    (None reads each file in one go).
+    """
+    data_dir = data_dir or DATA_DIR
+    sources = {name: os.path.join(data_dir, name) for name in SOURCES}
+    cache_path = os.path.join(data_dir, ".cache", "movies.pkl")
+
+    if use_cache:
+        cached = read_cache(cache_path, sources)
+        if cached is not None:
+            frame, lists = cached
+            for col in LIST_COLUMNS:
+                frame[col] = unpack_lists(*lists[col])
+            load_country_codes(data_dir)
+            print("[INFO] Datasets loaded from cache.")
+            return frame[SCALAR_COLUMNS + LIST_COLUMNS]
+        source_fingerprint = fingerprint(sources)
+
+    movies = _clean_frame(_read_sources(data_dir, chunksize))
+
+    if use_cache:
+        lists = {col: pack_lists(movies[col]) for col in LIST_COLUMNS}
+        write_cache(cache_path, source_fingerprint, movies[SCALAR_COLUMNS], lists)
+
+    load_country_codes(data_dir, use_cache)
+    print(f"[INFO] Datasets loaded successfully (peak RSS {peak_rss_mb():.0f} MB).")
+    return movies
+
+
+@instrument("load_compact", rows=lambda args, result: len(result[0]), size=None)
+def load_compact(data_dir=None, use_cache=True, chunksize=CHUNKSIZE):
+    """
+    Like load_data(), but without a Python list per row: returns
+    (movies, lists) where `movies` holds the scalar columns narrowed by
+    compact_frame() and `lists` maps each list column to the
+    (offsets, codes, categories) arrays of scripts.cache.pack_lists().
+    """
+    data_dir = data_dir or DATA_DIR
+    sources = {name: os.path.join(data_dir, name) for name in SOURCES}
+    cache_path = os.path.join(data_dir, ".cache", "movies.pkl")
+
+    cached = read_cache(cache_path, sources) if use_cache else None
+    if cached is not None:
+        frame, lists = cached
+        print("[INFO] Datasets loaded from cache (compact).")
+    else:
+        source_fingerprint = fingerprint(sources)
+        movies = _clean_frame(_read_sources(data_dir, chunksize))
+        frame = movies[SCALAR_COLUMNS]
+        lists = {col: pack_lists(movies[col]) for col in LIST_COLUMNS}
+        del movies
+        if use_cache:
+            write_cache(cache_path, source_fingerprint, frame, lists)
+    movies = compact_frame(frame)
+    load_country_codes(data_dir, use_cache)
+    print(f"[INFO] Compact dataset: {memory_usage(movies, lists) / (1 << 20):.1f} MB "
+          f"(peak RSS {peak_rss_mb():.0f} MB).")
+    return movies, lists
+
+
+def compact_frame(movies):
+    """
+    Narrow the scalar columns: actor and director names become
+    categoricals, id int32, year int16 and ratings float32 (read them back
+    with model.ratings()). Titles (nearly all distinct) stay strings and
+    revenue keeps its parsed dtype, float64 when any value is missing and
+    int64 otherwise (totals exceed float32 precision). Other columns are
+    left as they are.
+    """
+    return movies.astype({
+        "id": "int32",
+        "year": "int16",
+        "vote_average": "float32",
+        "top_actor": "category",
+        "director": "category",
+    })
+
+
+def memory_usage(movies, lists=None):
+    """
+    Bytes held by a movies frame, including the Python lists and strings
+    inside list columns (which memory_usage(deep=True) leaves out), plus
+    packed `lists` arrays if given.
+    """
+    total = 0
+    for col in movies.columns:
+        if col in LIST_COLUMNS:
+            values = movies[col].tolist()
+            strings = {id(x): x for lst in values for x in lst}
+            total += sum(sys.getsizeof(lst) for lst in values)
+            total += sum(sys.getsizeof(x) for x in strings.values())
+            total += movies[col].memory_usage(deep=False)
+        else:
+            total += movies[col].memory_usage(deep=True)
+    for offsets, codes, categories in (lists or {}).values():
+        total += offsets.nbytes + codes.nbytes + categories.nbytes
+        total += sum(sys.getsizeof(x) for x in categories)
+    return total
+
+
+def load_country_codes(data_dir=None, use_cache=True):
+    """
+    Distinct (iso_3166_1, name) pairs of production_countries as a frame,
+    registered with scripts.countries for the world map. Cached in
+    data/.cache/countries.pkl like the movies frame.
+    """
+    data_dir = data_dir or DATA_DIR
+    sources = {"movies_metadata.csv": os.path.join(data_dir, "movies_metadata.csv")}
+    cache_path = os.path.join(data_dir, ".cache", "countries.pkl")
+
+    cached = read_cache(cache_path, sources) if use_cache else None
+    if cached is not None:
+        codes = cached[0]
+    else:
+        source_fingerprint = fingerprint(sources)
+        column = pd.read_csv(sources["movies_metadata.csv"], usecols=["production_countries"])
+        pairs = {pair for cell in column["production_countries"] for pair in extract.country_codes(cell)}
+        codes = pd.DataFrame(sorted(pairs, key=str), columns=["code", "name"])
+        if use_cache:
+            write_cache(cache_path, source_fingerprint, codes, {})
+    countries.register(zip(codes["code"], codes["name"]))
+    return codes
+
 
-    base_path = os.path.dirname(__file__)
-    data_dir = os.path.join(base_path, "..", "data")
+def load_updates(updates_dir, chunksize=CHUNKSIZE):
+    """
+    Cleaned frame of new or corrected movies, read from a directory holding
+    the same three CSVs as data/ but only the rows that changed.
+    """
+    print(f"[INFO] Loading updates from {updates_dir}...")
+    load_country_codes(updates_dir, use_cache=False)
+    return _clean_frame(_read_sources(updates_dir, chunksize))
 
-    movies = pd.read_csv(os.path.join(data_dir, "movies_metadata.csv"), low_memory=False)
-    credits = pd.read_csv(os.path.join(data_dir, "credits.csv"))
-    keywords = pd.read_csv(os.path.join(data_dir, "keywords.csv"))
+
+def _clean_frame(movies):
+    movies = movies[SCALAR_COLUMNS + LIST_COLUMNS].reset_index(drop=True)
+    for col in LIST_COLUMNS:
+        movies[col] = [lst if isinstance(lst, list) else [] for lst in movies[col]]
+    return movies
+
+
+def dataset_version(data_dir=None):
+    """Short hash identifying the contents of the source CSVs (cheap after load_data())."""
+    data_dir = data_dir or DATA_DIR
+    sources = {name: os.path.join(data_dir, name) for name in SOURCES}
+    fp = fingerprint(sources)
+    h = hashlib.sha1(str(CACHE_VERSION).encode())
+    for name in SOURCES:
+        h.update(fp[name]["sha1"].encode())
+    return h.hexdigest()[:12]
+
+
+# ---------- Streaming readers ----------
+def _chunks(path, chunksize, usecols):
+    reader = pd.read_csv(path, usecols=usecols, chunksize=chunksize or None)
+    return [reader] if not chunksize else reader
+
+
+def read_credits(path, chunksize=CHUNKSIZE):
+    """
+    Read credits.csv reducing each chunk to (id, top_actor, director) right away,
+    so the raw cast/crew text of at most one chunk is alive at a time.
+    """
+    parts = []
+    for chunk in _chunks(path, chunksize, ["cast", "crew", "id"]):
+        parts.append(pd.DataFrame({
+            "id": chunk["id"],
+            # Only the first cast name and the first Director survive the merge
+            "top_actor": chunk["cast"].map(extract.first_name),
+            "director": chunk["crew"].map(extract.director),
+        }))
+    return pd.concat(parts) if parts else pd.DataFrame(columns=["id", "top_actor", "director"])
+
+
+def read_keywords(path, chunksize=CHUNKSIZE):
+    """Read keywords.csv as (id, keywords_list), chunk by chunk."""
+    parts = []
+    for chunk in _chunks(path, chunksize, ["id", "keywords"]):
+        parts.append(pd.DataFrame({
+            "id": chunk["id"],
+            "keywords_list": chunk["keywords"].map(parse_keywords),
+        }))
+    return pd.concat(parts) if parts else pd.DataFrame(columns=["id", "keywords_list"])
+
+
+def _clean_ids(table):
+    """Rows of a side table with a numeric id, as int."""
+    ids = pd.to_numeric(table['id'], errors='coerce')
+    table = table[ids.notna()].reset_index(drop=True)
+    return table.assign(id=ids.dropna().astype(int).to_numpy())
+
+
+def _read_sources(data_dir, chunksize):
+    print("[INFO] Loading TMDB datasets...")
+
+    movies = pd.read_csv(os.path.join(data_dir, "movies_metadata.csv"), usecols=METADATA_COLUMNS, low_memory=False)
+    credits = read_credits(os.path.join(data_dir, "credits.csv"), chunksize)
+    keywords = read_keywords(os.path.join(data_dir, "keywords.csv"), chunksize)
 
     # ---------- Clean release dates ----------
     movies['release_date'] = pd.to_datetime(movies['release_date'], errors='coerce')
@@ -54,39 +269,19 @@ def load_data():
     # Optional: Fill NaNs or drop them? 
     # For now, let's keep them as NaN so they are ignored in mean() or dropped later
     
-    credits['id'] = pd.to_numeric(credits['id'], errors='coerce')
-    credits = credits.dropna(subset=['id'])
-    credits['id'] = credits['id'].astype(int)
-
     # ---------- Parse lists ----------
     movies['genres_list'] = movies['genres'].apply(parse_genres)
     movies['countries'] = movies['production_countries'].apply(parse_countries)
 
-    keywords['keywords_list'] = keywords['keywords'].apply(parse_keywords)
-    movies['keywords_list'] = keywords['keywords_list']
-
-    # ---------- Parse credits ----------
-    credits['cast'] = credits['cast'].apply(parse_json)
-    credits['crew'] = credits['crew'].apply(parse_json)
-
-    def get_top_actor(cast_list):
-        return cast_list[0]['name'] if cast_list else None
-
-    def get_director(crew_list):
-        for item in crew_list:
-            if item.get('job') == 'Director':
-                return item.get('name')
-        return None
-
-    credits['top_actor'] = credits['cast'].apply(get_top_actor)
-    credits['director'] = credits['crew'].apply(get_director)
-
-    # ---------- Merge ----------
-    movies = movies.merge(
-        credits[['id', 'top_actor', 'director']],
-        on='id',
-        how='left'
-    )
+    # ---------- Join side tables by id ----------
+    # keywords.csv and credits.csv are matched on `id` through a sorted id
+    # index (first row wins for duplicated ids), never by row position
+    movies = movies.reset_index(drop=True)
+    keywords = _clean_ids(keywords)
+    movies['keywords_list'] = IdIndex(keywords['id']).take(keywords['keywords_list'], movies['id'])
 
-    print("[INFO] Datasets loaded successfully.")
+    credits = _clean_ids(credits)
+    credit_index = IdIndex(credits['id'])
+    movies['top_actor'] = credit_index.take(credits['top_actor'], movies['id'])
+    movies['director'] = credit_index.take(credits['director'], movies['id'])
     return movies
@@ -0,0 +1,156 @@
+# scripts/search.py
+
+"""
+Prefix search over actor (top_actor) and director names.
+
+PeopleIndex keeps every word-start suffix of every normalized name
+("tom hanks", "hanks") in one sorted list, so the names matching a
+prefix are a single bisect range, never a scan of the movies. Each
+person's movies are a slice of one row array grouped by person, which is
+all the per-person aggregates (person()) need.
+"""
+
+import bisect
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from scripts.model import ratings
+
+# role -> movies column
+ROLES = {"actor": "top_actor", "director": "director"}
+
+# Most matches search() returns
+MAX_LIMIT = 50
+
+# Ranked matches of prefixes covering more keys than this are memoized
+MEMO_RANGE = 2000
+
+
+def normalize(name):
+    """Case-folded, accent-free, single-spaced form of a name ("Zoë  Saldaña" -> "zoe saldana")."""
+    decomposed = unicodedata.normalize("NFKD", str(name))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+class PeopleIndex:
+    """
+    Actors and directors of `tables.movies`, searchable by the prefix of
+    any word of their name. Person ids run over actors, then directors;
+    `rank` orders them by film count (descending), then name.
+    """
+
+    def __init__(self, tables):
+        movies = tables.movies
+        # the columns person() reads, as arrays
+        self.columns = {col: movies[col].to_numpy() for col in ["id", "title", "year", "revenue"]}
+        self.columns["vote_average"] = ratings(movies)
+        self.genre_movies = tables.genres["movie"].to_numpy()
+        self.genre_codes = tables.genres["genre"].cat.codes.to_numpy()
+        self.genre_names = tables.genres["genre"].cat.categories.astype(str).tolist()
+        names, roles, films, rows = [], [], [], []
+        for role, column in ROLES.items():
+            codes, uniques = pd.factorize(movies[column])
+            order = np.argsort(codes, kind="stable")
+            rows.append(order[codes[order] >= 0])
+            films.append(np.bincount(codes[codes >= 0], minlength=len(uniques)))
+            names.extend(str(name) for name in uniques)
+            roles.extend([role] * len(uniques))
+        self.names = names
+        self.roles = np.array(roles)
+        self.films = np.concatenate(films).astype(np.int64)
+        self.rows = np.concatenate(rows).astype(np.int64)
+        self.starts = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(self.films, out=self.starts[1:])
+
+        by_rank = np.lexsort((np.array(names, dtype=object), -self.films)) if names else np.array([], dtype=np.int64)
+        self.rank = np.empty(len(names), dtype=np.int64)
+        self.rank[by_rank] = np.arange(len(names))
+        self.by_rank = by_rank
+
+        keys = []
+        for person, name in enumerate(names):
+            words = normalize(name).split(" ")
+            keys.extend((" ".join(words[i:]), person) for i in range(len(words)))
+        keys.sort()
+        self.keys = [key for key, _ in keys]
+        self.people = np.array([person for _, person in keys], dtype=np.int64)
+        self._memo = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, limit=10, role=None):
+        """Person ids whose name has a word starting with `query`, most films first."""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\U0010ffff", lo)
+        key = (prefix, role)
+        if key in self._memo:
+            return self._memo[key][:limit]
+        people = self.people[lo:hi]
+        if role is not None:
+            people = people[self.roles[people] == role]
+        # unique ranks come out sorted: best first, one entry per person
+        best = self.by_rank[np.unique(self.rank[people])[:MAX_LIMIT]].tolist()
+        if hi - lo > MEMO_RANGE:
+            self._memo[key] = best
+        return best[:limit]
+
+    def summary(self, person):
+        """Name, role and film count of a person."""
+        return {"name": self.names[person], "role": str(self.roles[person]), "films": int(self.films[person])}
+
+    def person(self, person, top=10):
+        """
+        summary() plus aggregates over the person's movies: total revenue,
+        mean rating, films and revenue per year, films per genre and the
+        `top` highest-grossing movies. Missing revenues and ratings are
+        left out of the aggregates and reported as None per movie.
+        """
+        columns = self.columns
+        rows = self.rows[self.starts[person]:self.starts[person + 1]]
+        year = columns["year"][rows].astype(np.float64)
+        revenue = columns["revenue"][rows].astype(np.float64)
+        rating = columns["vote_average"][rows].astype(np.float64)
+        rated = rating[~np.isnan(rating)]
+        dated = ~np.isnan(year)
+        years, where = np.unique(year[dated], return_inverse=True)
+
+        # genres of each movie: its slice of the (movie-sorted) genres table
+        bounds = np.searchsorted(self.genre_movies, np.stack([rows, rows + 1]))
+        codes = self.genre_codes
+        genre_codes = np.concatenate([codes[a:b] for a, b in bounds.T.tolist()]) if len(rows) else codes[:0]
+        per_genre = np.bincount(genre_codes, minlength=len(self.genre_names))
+        genre_order = np.lexsort((np.arange(len(per_genre)), -per_genre))
+        genre_order = genre_order[per_genre[genre_order] > 0]
+
+        # missing revenue sorts last
+        biggest = rows[np.argsort(-np.nan_to_num(revenue, nan=-np.inf), kind="stable")[:top]].tolist()
+        return dict(
+            self.summary(person),
+            revenue=float(np.nansum(revenue)),
+            rating=round(float(rated.mean()), 2) if len(rated) else None,
+            first_year=int(years[0]) if len(years) else None,
+            last_year=int(years[-1]) if len(years) else None,
+            by_year={
+                "year": years.astype(np.int64).tolist(),
+                "films": np.bincount(where, minlength=len(years)).tolist(),
+                "revenue": np.bincount(where, weights=np.nan_to_num(revenue[dated]), minlength=len(years)).tolist(),
+            },
+            genres={self.genre_names[i]: int(per_genre[i]) for i in genre_order},
+            movies=[
+                {"id": int(columns["id"][r]), "title": _optional(columns["title"][r], str),
+                 "year": _optional(columns["year"][r], int), "revenue": _optional(columns["revenue"][r], int),
+                 "rating": _optional(columns["vote_average"][r], lambda v: round(float(v), 2))}
+                for r in biggest
+            ],
+        )
+
+
+def _optional(value, convert):
+    return None if pd.isna(value) else convert(value)
@@ -0,0 +1,171 @@
+# scripts/topk.py
+
+"""
+Top-k counting over integer-coded names.
+
+Exact mode counts with np.bincount, so memory is one counter per distinct
+name, no matter how many (genre, keyword) pairs there are. Approximate
+mode (SpaceSaving) keeps at most `capacity` counters and consumes its
+input as a stream; every name whose true count exceeds total / capacity
+is guaranteed to be kept, and reported counts overestimate by at most
+the smallest counter. Each chunk of the stream is pre-counted with
+np.unique, so the sketch sees one weighted update per distinct name in
+the chunk rather than one per row.
+
+grouped_top_k() takes its (group, code) pairs as an iterable of chunks,
+so callers can generate them (model.genre_keyword_chunks) instead of
+materializing every pair.
+
+Set APPROX_CAPACITY (app.py --approx-topk N) to make top_k() and
+grouped_top_k() use the approximate mode everywhere.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+# None = exact counts; a number = Space-Saving with that many counters
+APPROX_CAPACITY = None
+
+# Rows fed to a sketch per step when streaming
+CHUNK = 8192
+
+
+# ---------- Exact ----------
+def _ranked(counts, categories, k):
+    """Top-k of a dense count array: largest first, ties by code (= name order)."""
+    nonzero = np.flatnonzero(counts > 0)
+    if len(nonzero) > k:
+        kth = np.partition(counts[nonzero], len(nonzero) - k)[len(nonzero) - k]
+        nonzero = nonzero[counts[nonzero] >= kth]
+    order = np.lexsort((nonzero, -counts[nonzero]))[:k]
+    chosen = nonzero[order]
+    return pd.Series(counts[chosen].astype(np.int64), index=pd.Index(np.asarray(categories)[chosen], dtype=object))
+
+
+def exact_top_k(codes, categories, k, weights=None):
+    counts = np.bincount(codes, weights=weights, minlength=len(categories))
+    return _ranked(counts, categories, k)
+
+
+# ---------- Approximate ----------
+class SpaceSaving:
+    """Space-Saving heavy hitters (Metwally et al.) with a fixed number of counters."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        # (count, item), may hold stale entries; only kept once the counters
+        # are full and evictions need the minimum
+        self._heap = None
+
+    def add(self, item, count=1):
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+        elif len(counts) < self.capacity:
+            counts[item] = count
+            self.errors[item] = 0
+        else:
+            if self._heap is None:
+                self._heap = [(c, i) for i, c in counts.items()]
+                heapq.heapify(self._heap)
+            # replace the smallest counter; its count becomes the new item's error
+            victim, floor = self._pop_min()
+            del counts[victim], self.errors[victim]
+            counts[item] = floor + count
+            self.errors[item] = floor
+        if self._heap is None:
+            return
+        heapq.heappush(self._heap, (counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, i) for i, c in counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return item, count
+
+    def update(self, items, weights=None):
+        if weights is None:
+            for item in items:
+                self.add(item)
+        else:
+            for item, w in zip(items, weights):
+                if w:
+                    self.add(item, w)
+
+    def top(self, k, categories=None):
+        """Estimated top-k as a Series (index: item, or categories[item] when given)."""
+        counts = pd.Series(self.counts, dtype="int64")
+        counts = counts.sort_index().sort_values(ascending=False, kind="stable").head(k)
+        if categories is not None:
+            counts.index = pd.Index(np.asarray(categories)[counts.index.to_numpy(dtype=np.int64)], dtype=object)
+        return counts
+
+
+def _counted(codes, weights=None):
+    """(distinct codes, their total count or weight) of one chunk, as lists."""
+    items, inverse = np.unique(codes, return_inverse=True)
+    counts = np.bincount(inverse, weights=weights, minlength=len(items))
+    if weights is None or np.issubdtype(np.asarray(weights).dtype, np.integer):
+        counts = counts.astype(np.int64)
+    return items.tolist(), counts.tolist()
+
+
+def approx_top_k(codes, categories, k, weights=None, capacity=None):
+    sketch = SpaceSaving(max(capacity or APPROX_CAPACITY or k, k))
+    for start in range(0, len(codes), CHUNK):
+        w = None if weights is None else weights[start:start + CHUNK]
+        sketch.update(*_counted(codes[start:start + CHUNK], w))
+    return sketch.top(k, categories)
+
+
+# ---------- Entry points ----------
+def top_k(codes, categories, k, weights=None):
+    """
+    The k most frequent of `codes` (indexes into `categories`, optionally
+    weighted) as a Series name -> count, largest first, ties by code.
+    """
+    codes = np.asarray(codes)
+    if APPROX_CAPACITY:
+        return approx_top_k(codes, categories, k, weights)
+    return exact_top_k(codes, categories, k, weights)
+
+
+def grouped_top_k(pairs, n_groups, categories, k):
+    """
+    top_k() within each group: {group code: Series}, for groups 0..n_groups-1
+    that have any counts. `pairs` is an iterable of (groups, codes) array
+    chunks; memory is bounded by the largest chunk plus the counters
+    (n_groups x len(categories) exact, n_groups x capacity approximate).
+    """
+    width = len(categories)
+    result = {}
+    if APPROX_CAPACITY:
+        sketches = {}
+        for groups, codes in pairs:
+            keys = np.asarray(groups, dtype=np.int64) * width + np.asarray(codes, dtype=np.int64)
+            for key, count in zip(*_counted(keys)):
+                group, item = divmod(key, width)
+                sketch = sketches.get(group)
+                if sketch is None:
+                    sketch = sketches[group] = SpaceSaving(max(APPROX_CAPACITY, k))
+                sketch.add(item, count)
+        for group, sketch in sorted(sketches.items()):
+            result[group] = sketch.top(k, categories)
+        return result
+
+    counts = np.zeros(n_groups * width, dtype=np.int64)
+    for groups, codes in pairs:
+        keys = np.asarray(groups, dtype=np.int64) * width + np.asarray(codes, dtype=np.int64)
+        counts += np.bincount(keys, minlength=n_groups * width)
+    counts = counts.reshape(n_groups, width)
+    for group in range(n_groups):
+        if counts[group].any():
+            result[group] = _ranked(counts[group], categories, k)
+    return result
@@ -1,223 +1,247 @@
 # scripts/visualize.py
 
+import base64
+import functools
+
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-from collections import defaultdict
+
+from scripts import countries
+from scripts.metrics import instrument
+from scripts.payload import dumps
+from scripts.model import (
+    build_tables,
+    top_keywords,
+    genre_breakdown,
+    genre_year_revenue,
+    country_counts,
+    director_stats,
+    DirectorTable,
+    top_actors_by_genre,
+)
+
+# TEAL PALETTE shared by panel5 and its genre-specific versions
+TEAL_PALETTE = [
+    "#66FCF1", "#45A29E", "#3EC7BA", "#31A6A4",
+    "#2E8C8E", "#207070", "#175E5C", "#0E4A47"
+]
+
+# Scatter plots with more points than this use WebGL (scattergl) instead of SVG
+WEBGL_POINTS = 200
+
+def darker(hex_color):
+    hex_color = hex_color.lstrip("#")
+    r = int(hex_color[0:2], 16) * 0.75
+    g = int(hex_color[2:4], 16) * 0.75
+    b = int(hex_color[4:6], 16) * 0.75
+    return f"rgba({int(r)},{int(g)},{int(b)},0.95)"
+
+def empty_figure():
+    # empty figure to avoid undefined lookups on the client
+    fig = go.Figure()
+    fig.update_layout(
+        paper_bgcolor="#1f2833",
+        plot_bgcolor="#1f2833",
+        font=dict(color="#c5c6c7")
+    )
+    return fig.to_json()
+
 
 # ---------------------------
 # Genre-filtered panel
 # ---------------------------
-def genre_filter_data(movies):
+@instrument("genre_filter_data")
+def genre_filter_data(movies, tables=None):
     """
     Build genre-specific versions of:
     - panel1 (keywords bar for that genre)
     - panel3 (revenue over time for that genre)
     - panel5 (sunburst identical style to original panel5)
-    Returns: (panel1_genre_dict, panel3_genre_dict, panel5_genre_dict)
+    Returns: (panel1_genre_dict, panel5_genre_dict, panel3_genre_dict)
     """
     print("[INFO] Generating Genre-Based Panel...")
-    genre_keywords = defaultdict(lambda: defaultdict(int))
-    genre_actors = defaultdict(lambda: defaultdict(int))
-
-    # Count keywords + actors per genre
-    for _, row in movies.iterrows():
-        # skip rows with missing lists gracefully
-        genres = row.get("genres_list") or []
-        keywords = row.get("keywords_list") or []
-        top_actor = row.get("top_actor")
-
-        for g in genres:
-            for kw in keywords:
-                genre_keywords[g][kw] += 1
-            if top_actor:
-                genre_actors[g][top_actor] += 1
+    tables = tables if tables is not None else build_tables(movies)
+
+    # Top keywords, top actors and revenue by year for every genre in one pass
+    breakdown = genre_breakdown(tables)
 
     panel1_genre = {}
     panel5_genre = {}
     panel3_genre = {}
 
-    # TEAL PALETTE same as original panel5
-    TEAL_PALETTE = [
-        "#66FCF1", "#45A29E", "#3EC7BA", "#31A6A4",
-        "#2E8C8E", "#207070", "#175E5C", "#0E4A47"
-    ]
-
-    def darker(hex_color):
-        hex_color = hex_color.lstrip("#")
-        r = int(hex_color[0:2], 16) * 0.75
-        g = int(hex_color[2:4], 16) * 0.75
-        b = int(hex_color[4:6], 16) * 0.75
-        return f"rgba({int(r)},{int(g)},{int(b)},0.95)"
-
     # Build genre-specific charts
-    for i, g in enumerate(sorted(genre_keywords.keys())):
-        # --------------------------
-        # PANEL-1: keywords bar (same UI)
-        # --------------------------
-        df_kw = pd.DataFrame({
-            "keyword": list(genre_keywords[g].keys()),
-            "count": list(genre_keywords[g].values())
-        })
-
-        if df_kw.empty:
-            # create an empty figure to avoid undefined lookups
-            empty_fig1 = go.Figure()
-            empty_fig1.update_layout(
-                paper_bgcolor="#1f2833",
-                plot_bgcolor="#1f2833",
-                font=dict(color="#c5c6c7")
-            )
-            panel1_genre[g] = empty_fig1.to_json()
-        else:
-            df_kw = df_kw.sort_values("count", ascending=False).head(25)
-            fig1 = go.Figure()
-            fig1.add_trace(go.Bar(
-                x=df_kw["count"].tolist(),
-                y=df_kw["keyword"].tolist(),
-                orientation="h",
-                marker=dict(
-                    color=df_kw["count"].tolist(),
-                    colorscale="Viridis",
-                    showscale=True,
-                    colorbar=dict(title="Count")
-                ),
-                hovertemplate='<b>%{y}</b><br>Count: %{x}<extra></extra>'
-            ))
-            fig1.update_layout(
-                yaxis={'categoryorder': 'total ascending'},
-                xaxis_title="Count",
-                yaxis_title="Keyword",
-                height=600,
-                margin=dict(l=150, r=50, t=20, b=50),
-                yaxis_tickfont=dict(size=11),
-                paper_bgcolor='#1f2833',
-                plot_bgcolor='#1f2833',
-                font=dict(color='#c5c6c7')
-            )
-            panel1_genre[g] = fig1.to_json()
-
-        # --------------------------
-        # PANEL-5: sunburst that mirrors original UI
-        # --------------------------
-        df_ac = pd.DataFrame({
-            "actor": list(genre_actors[g].keys()),
-            "count": list(genre_actors[g].values())
-        })
-
-        if df_ac.empty:
-            empty_fig5 = go.Figure()
-            empty_fig5.update_layout(
-                paper_bgcolor="#1f2833",
-                plot_bgcolor="#1f2833",
-                font=dict(color="#c5c6c7")
-            )
-            panel5_genre[g] = empty_fig5.to_json()
-        else:
-            df_ac = df_ac.sort_values("count", ascending=False).head(30).reset_index(drop=True)
-
-            # Labels: central genre + actors
-            labels = [g] + df_ac["actor"].tolist()
-            parents = [""] + [g for _ in df_ac["actor"]]
-
-            # values: aggregate at center + actor counts
-            center_value = int(df_ac["count"].sum())
-            values = [center_value] + df_ac["count"].astype(int).tolist()
-
-            # Colors: give the genre node a palette color, actors darker versions
-            palette_color = TEAL_PALETTE[i % len(TEAL_PALETTE)]
-            colors = [palette_color] + [darker(palette_color) for _ in df_ac["actor"]]
-
-            fig5 = go.Figure(go.Sunburst(
-                labels=labels,
-                parents=parents,
-                values=values,
-                branchvalues="total",
-                maxdepth=2,
-                insidetextorientation='radial',
-                marker=dict(colors=colors, line=dict(width=1.5, color="white")),
-                hovertemplate="<b>%{label}</b><br>Movies: %{value}<extra></extra>"
-            ))
-
-            fig5.update_layout(
-                margin=dict(l=20, r=20, t=80, b=20),
-                height=650,
-                paper_bgcolor="#1f2833",
-                plot_bgcolor="#1f2833",
-                font=dict(color="#c5c6c7")
-            )
-
-            panel5_genre[g] = fig5.to_json()
-
-        # --------------------------
-        # PANEL-3: revenue over time for selected genre
-        # (single-line time series to match streamgraph style but only for that genre)
-        # --------------------------
-        # filter movies containing this genre
-        try:
-            mask = movies["genres_list"].apply(lambda lst: g in lst if isinstance(lst, list) else False)
-            df_year = movies[mask].groupby("year")["revenue"].sum().reset_index().sort_values("year")
-        except Exception:
-            df_year = pd.DataFrame(columns=["year", "revenue"])
-
-        if df_year.empty:
-            empty_fig3 = go.Figure()
-            empty_fig3.update_layout(
-                paper_bgcolor='#1f2833',
-                plot_bgcolor='#1f2833',
-                font=dict(color='#c5c6c7')
-            )
-            panel3_genre[g] = empty_fig3.to_json()
-        else:
-            fig3 = go.Figure()
-            fig3.add_trace(go.Scatter(
-                x=df_year["year"].tolist(),
-                y=df_year["revenue"].tolist(),
-                mode='lines',
-                name=g,
-                line=dict(width=2)
-            ))
-            fig3.update_layout(
-                xaxis_title="Year",
-                yaxis_title="Revenue",
-                paper_bgcolor='#1f2833',
-                plot_bgcolor='#1f2833',
-                font=dict(color='#c5c6c7'),
-                xaxis=dict(gridcolor='#45a29e'),
-                yaxis=dict(gridcolor='#45a29e'),
-                height=600
-            )
-            panel3_genre[g] = fig3.to_json()
+    for i, (g, data) in enumerate(breakdown.items()):
+        panel1_genre[g], panel5_genre[g], panel3_genre[g] = genre_figures(g, i, data)
 
     return panel1_genre, panel5_genre, panel3_genre
 
 
+def genre_figures(g, i, data):
+    """(panel1, panel5, panel3) data payloads for genre `g`; `i` picks its palette colour."""
+    return (
+        genre_keyword_data(g, data.keywords),
+        genre_actor_data(g, data.actors, TEAL_PALETTE[i % len(TEAL_PALETTE)]),
+        genre_revenue_data(g, data.revenue),
+    )
+
+
+# ---------------------------
+# Genre figures: one template per panel + data per genre
+# ---------------------------
+# Every genre's version of a panel has the same layout and trace styling;
+# only the arrays (and panel5's colour) differ. genre_templates() holds
+# the shared part once, the genre_*_data() payloads the rest, and
+# payload.merge_figure() (or static/app.js) puts a figure back together.
+
+def _payload(obj):
+    return dumps(obj).decode("utf-8")
+
+
+def typed_array(values, dtype):
+    """A numeric sequence as a Plotly base64 typed array ("i4", "f8", ...)."""
+    array = np.ascontiguousarray(values, dtype="<" + dtype)
+    return {"dtype": dtype, "bdata": base64.b64encode(array.tobytes()).decode("ascii")}
+
+
+def genre_keyword_template():
+    """PANEL-1: keywords bar (same UI)"""
+    fig1 = go.Figure()
+    fig1.add_trace(go.Bar(
+        orientation="h",
+        marker=dict(
+            colorscale="Viridis",
+            showscale=True,
+            colorbar=dict(title="Count")
+        ),
+        hovertemplate='<b>%{y}</b><br>Count: %{x}<extra></extra>'
+    ))
+    fig1.update_layout(
+        yaxis={'categoryorder': 'total ascending'},
+        xaxis_title="Count",
+        yaxis_title="Keyword",
+        height=600,
+        margin=dict(l=150, r=50, t=20, b=50),
+        yaxis_tickfont=dict(size=11),
+        paper_bgcolor='#1f2833',
+        plot_bgcolor='#1f2833',
+        font=dict(color='#c5c6c7')
+    )
+    return fig1.to_json()
+
+
+def genre_actor_template():
+    """PANEL-5: sunburst that mirrors original UI"""
+    fig5 = go.Figure(go.Sunburst(
+        branchvalues="total",
+        maxdepth=2,
+        insidetextorientation='radial',
+        marker=dict(line=dict(width=1.5, color="white")),
+        hovertemplate="<b>%{label}</b><br>Movies: %{value}<extra></extra>"
+    ))
+    fig5.update_layout(
+        margin=dict(l=20, r=20, t=80, b=20),
+        height=650,
+        paper_bgcolor="#1f2833",
+        plot_bgcolor="#1f2833",
+        font=dict(color="#c5c6c7")
+    )
+    return fig5.to_json()
+
+
+def genre_revenue_template():
+    """
+    PANEL-3: revenue over time for selected genre
+    (single-line time series to match streamgraph style but only for that genre)
+    """
+    fig3 = go.Figure()
+    fig3.add_trace(go.Scatter(
+        mode='lines',
+        line=dict(width=2)
+    ))
+    fig3.update_layout(
+        xaxis_title="Year",
+        yaxis_title="Revenue",
+        paper_bgcolor='#1f2833',
+        plot_bgcolor='#1f2833',
+        font=dict(color='#c5c6c7'),
+        xaxis=dict(gridcolor='#45a29e'),
+        yaxis=dict(gridcolor='#45a29e'),
+        height=600
+    )
+    return fig3.to_json()
+
+
+@functools.lru_cache(maxsize=None)
+def genre_templates():
+    """{panel: template JSON} for the panels that have genre versions."""
+    return {
+        "panel1": genre_keyword_template(),
+        "panel3": genre_revenue_template(),
+        "panel5": genre_actor_template(),
+    }
+
+
+@instrument("genre_panel1", rows=lambda args, result: len(args[1]))
+def genre_keyword_data(g, keywords):
+    if keywords.empty:
+        return empty_figure()
+    counts = typed_array(keywords.to_numpy(), "i4")
+    return _payload({"base": "panel1", "data": [{
+        "x": counts,
+        "y": keywords.index.astype(str).tolist(),
+        "marker": {"color": counts},
+    }]})
+
+
+@instrument("genre_panel5", rows=lambda args, result: len(args[1]))
+def genre_actor_data(g, actors, palette_color):
+    if actors.empty:
+        return empty_figure()
+
+    # Labels: central genre + actors
+    names = actors.index.astype(str).tolist()
+    # values: aggregate at center + actor counts
+    values = np.concatenate([[actors.sum()], actors.to_numpy()])
+    # Colors: give the genre node a palette color, actors darker versions
+    colors = [palette_color] + [darker(palette_color)] * len(names)
+    return _payload({"base": "panel5", "data": [{
+        "labels": [g] + names,
+        "parents": [""] + [g] * len(names),
+        "values": typed_array(values, "i4"),
+        "marker": {"colors": colors},
+    }]})
+
+
+@instrument("genre_panel3", rows=lambda args, result: len(args[1]))
+def genre_revenue_data(g, revenue):
+    if revenue.empty:
+        return empty_figure()
+    return _payload({"base": "panel3", "data": [{
+        "x": typed_array(revenue.index.to_numpy(), "i4"),
+        "y": typed_array(revenue.to_numpy(), "f8"),
+        "name": g,
+    }]})
+
+
 # ---------------------------
 # Panels view
 # ---------------------------
-def panel1_genre_keyword(movies):
+@instrument("panel1")
+def panel1_genre_keyword(movies, tables=None):
     """Genre-Keyword Map (Bar Chart)"""
     print("[INFO] Generating Panel 1...")
+    tables = tables if tables is not None else build_tables(movies)
+
+    # Count keywords per genre, keeping only the top 50 (ties keep name order)
+    return keyword_bar_figure(top_keywords(tables, 50))
 
-    # Count keywords per genre
-    rows = []
-    for _, row in movies.iterrows():
-        for g in row["genres_list"]:
-            for kw in row["keywords_list"]:
-                rows.append((str(g), str(kw)))
-    df = pd.DataFrame(rows, columns=["genre", "keyword"])
-
-    top_kw = (
-        df.groupby("keyword")
-        .size()
-        .sort_values(ascending=False)
-        .head(50)
-        .reset_index(name="count")
-    )
 
+def keyword_bar_figure(top_kw):
+    """Panel 1 figure from a keyword -> count Series, largest first."""
     # Convert to Python lists for proper serialization
-    keywords = top_kw["keyword"].tolist()
-    counts = top_kw["count"].tolist()
+    keywords = top_kw.index.astype(str).tolist()
+    counts = top_kw.tolist()
 
     # Create bar chart with go.Bar
     fig = go.Figure()
@@ -248,24 +272,28 @@ def panel1_genre_keyword(movies):
     
     return fig.to_json()
 
-def panel2_director_matrix(movies):
+@instrument("panel2")
+def panel2_director_matrix(movies, tables=None):
     """Director Style Matrix (Scatter)"""
     print("[INFO] Generating Panel 2...")
+    if tables is not None:
+        movies = tables.movies
 
-    directors = movies.groupby("director").agg({
-        "vote_average": "mean",
-        "revenue": "mean",
-        "title": "count"
-    }).dropna().reset_index()
-    
-    directors = directors.sort_values("revenue", ascending=False).head(100)
-    
+    # top 100 directors by mean revenue
+    _, directors = DirectorTable(director_stats(movies)).page("revenue", limit=100)
+    return director_figure(directors)
+
+
+def director_figure(directors):
+    """Panel 2 figure from rows of (director, vote_average, revenue)."""
     x_vals = directors["revenue"].tolist()
     y_vals = directors["vote_average"].tolist()
     hover_names = directors["director"].tolist()
-    
+    # large slices (/graphs/panel2?limit=1000) are drawn with WebGL
+    scatter = go.Scattergl if len(directors) > WEBGL_POINTS else go.Scatter
+
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=x_vals,
         y=y_vals,
         mode='markers',
@@ -294,22 +322,23 @@ def panel2_director_matrix(movies):
     
     return fig.to_json()
 
-def panel3_streamgraph(movies):
+@instrument("panel3")
+def panel3_streamgraph(movies, tables=None):
     """Genre streamgraph over time (Area Chart)"""
     print("[INFO] Generating Panel 3...")
+    tables = tables if tables is not None else build_tables(movies)
 
-    rows = []
-    for _, row in movies.iterrows():
-        for g in row["genres_list"]:
-            rows.append((row["year"], g, row["revenue"]))
+    grouped = genre_year_revenue(tables)
+    grouped["genre"] = grouped["genre"].astype(str)
+    return streamgraph_figure(grouped)
 
-    df = pd.DataFrame(rows, columns=["year", "genre", "revenue"])
-    grouped = df.groupby(["year", "genre"])["revenue"].sum().reset_index()
-    
+
+def streamgraph_figure(grouped):
+    """Panel 3 figure from (year, genre, revenue) rows sorted by year and genre."""
     fig = go.Figure()
     
-    for genre in grouped["genre"].unique():
-        genre_data = grouped[grouped["genre"] == genre].sort_values("year")
+    for genre, genre_data in grouped.groupby("genre", sort=False):
+        genre_data = genre_data.sort_values("year")
         fig.add_trace(go.Scatter(
             x=genre_data["year"].tolist(),
             y=genre_data["revenue"].tolist(),
@@ -330,25 +359,31 @@ def panel3_streamgraph(movies):
     
     return fig.to_json()
 
-def panel4_global_map(movies):
+@instrument("panel4")
+def panel4_global_map(movies, tables=None):
     """Premium World Map — Country Film Production Tiers"""
     print("[INFO] Generating Panel 4...")
+    tables = tables if tables is not None else build_tables(movies)
 
-    rows = []
-    for _, row in movies.iterrows():
-        for c in row["countries"]:
-            rows.append(c)
+    counts = country_counts(tables)
+    missing = countries.unmatched(counts.index.astype(str).tolist())
+    if missing:
+        print(f"[INFO] Panel 4: {len(missing)} countries without an ISO-3 code are not drawn: {', '.join(missing)}")
+    return world_map_figure(counts)
 
-    df = pd.DataFrame(rows, columns=["country"])
-    country_counts = df["country"].value_counts().reset_index()
-    country_counts.columns = ["country", "count"]
+
+def world_map_figure(counts):
+    """
+    Panel 4 figure from a country -> movie count Series: one go.Choropleth
+    trace per production tier, located by ISO-3 code (see scripts.countries).
+    """
+    names = counts.index.astype(str).to_numpy()
+    values = counts.to_numpy()
+    codes = pd.Series(countries.to_iso3(names), dtype=object)
 
     bins = [-1, 0, 10, 50, 100, 500, 99999]
     labels = ["No Data", "1-10", "11-50", "51-100", "101-500", ">500"]
-
-    country_counts["production_level"] = pd.cut(
-        country_counts["count"], bins=bins, labels=labels
-    )
+    tiers = pd.cut(values, bins=bins, labels=labels)
 
     midnight_palette = [
         "#2c3e50",
@@ -359,16 +394,24 @@ def panel4_global_map(movies):
         "#66fcf1",
     ]
 
-    fig = px.choropleth(
-        country_counts,
-        locations="country",
-        locationmode="country names",
-        color="production_level",
-        hover_name="country",
-        hover_data={"count": True, "production_level": False},
-        color_discrete_sequence=midnight_palette,
-        category_orders={"production_level": labels},
-    )
+    fig = go.Figure()
+    for label, color in zip(labels, midnight_palette):
+        mask = (tiers == label) & codes.notna().to_numpy()
+        if not mask.any():
+            continue
+        fig.add_trace(go.Choropleth(
+            locations=codes[mask].tolist(),
+            locationmode="ISO-3",
+            z=[1] * int(mask.sum()),
+            colorscale=[[0.0, color], [1.0, color]],
+            showscale=False,
+            name=label,
+            legendgroup=label,
+            showlegend=True,
+            hovertext=names[mask].tolist(),
+            customdata=values[mask].tolist(),
+            hovertemplate="<b>%{hovertext}</b><br><br>count=%{customdata}<extra></extra>",
+        ))
 
     fig.update_geos(
         showframe=False,
@@ -401,57 +444,28 @@ def panel4_global_map(movies):
 
     return fig.to_json()
 
-def panel5_actor_genre_network(movies):
+@instrument("panel5")
+def panel5_actor_genre_network(movies, tables=None):
     """Circle Packing with Beautiful Teal Gradient Theme"""
     print("[INFO] Generating Panel 5...")
+    tables = tables if tables is not None else build_tables(movies)
 
-    records = []
-    actor_counts = {}
-
-    for _, row in movies.iterrows():
-        actor = row["top_actor"]
-        genres = row["genres_list"]
-        if not actor or not genres:
-            continue
-
-        actor_counts[actor] = actor_counts.get(actor, 0) + 1
+    # {genre: {actor: count}} for the 30 most frequent top-billed actors
+    return actor_sunburst_figure(top_actors_by_genre(tables, top=30))
 
-        for g in genres:
-            records.append((str(actor), str(g)))
-
-    top30 = sorted(actor_counts.items(), key=lambda x: x[1], reverse=True)[:30]
-    top30_names = [a for a, _ in top30]
-
-    filtered_records = [(a, g) for a, g in records if a in top30_names]
 
+def actor_sunburst_figure(genre_actor_counts):
+    """Panel 5 figure from {genre: {actor: count}}, genres in display order."""
     labels = []
     parents = []
     values = []
     colors = []
 
-    genre_set = sorted(set(g for _, g in filtered_records))
-
-    TEAL_PALETTE = [
-        "#66FCF1", "#45A29E", "#3EC7BA", "#31A6A4",
-        "#2E8C8E", "#207070", "#175E5C", "#0E4A47"
-    ]
+    genre_set = list(genre_actor_counts)
 
     def get_genre_color(i):
         return TEAL_PALETTE[i % len(TEAL_PALETTE)]
 
-    def darker(hex_color):
-        hex_color = hex_color.lstrip("#")
-        r = int(hex_color[0:2], 16) * 0.75
-        g = int(hex_color[2:4], 16) * 0.75
-        b = int(hex_color[4:6], 16) * 0.75
-        return f"rgba({int(r)},{int(g)},{int(b)},0.95)"
-
-    genre_actor_counts = {}
-    for actor, genre in filtered_records:
-        if genre not in genre_actor_counts:
-            genre_actor_counts[genre] = {}
-        genre_actor_counts[genre][actor] = genre_actor_counts[genre].get(actor, 0) + 1
-
     for i, genre in enumerate(genre_set):
         g_color = get_genre_color(i)
 
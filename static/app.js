@@ -1,20 +1,109 @@
 // static/app.js
 
-// Helps to render plot
-function plot(id, jsonStr) {
-    if (!jsonStr) return;
-    const fig = JSON.parse(jsonStr);
-    Plotly.newPlot(id, fig.data, fig.layout, { responsive: true });
+// Parsed figures fetched so far, keyed by their URL
+const figureCache = {};
+
+// Merged genre figures, keyed by panel and genre
+const genreFigureCache = {};
+
+// Panels with a genre-specific version:
+// Panel-1: genre-specific keywords
+// Panel-3: genre-specific revenue time series (single-line)
+// Panel-5: genre-specific sunburst
+const GENRE_PANELS = ["panel1", "panel3", "panel5"];
+
+// Draws the first figure into a panel, then updates it in place:
+// Plotly.react diffs against the chart on screen instead of rebuilding it
+function plot(id, figure) {
+    if (!figure) return;
+    Plotly.react(id, figure.data, figure.layout, { responsive: true });
+}
+
+// Fetch a figure once; later calls reuse the cached promise
+function fetchFigure(url) {
+    if (!figureCache[url]) {
+        figureCache[url] = fetch(url).then(response => {
+            if (!response.ok) throw new Error('Failed to load ' + url);
+            return response.json();
+        });
+        figureCache[url].catch(() => delete figureCache[url]);
+    }
+    return figureCache[url];
+}
+
+function panelUrl(panel) {
+    return '/graphs/' + panel;
+}
+
+function templateUrl(panel) {
+    return '/graphs/' + panel + '/template';
+}
+
+function genreDataUrl(panel, genre) {
+    return '/graphs/' + panel + '/genre/' + encodeURIComponent(genre) + '/data';
+}
+
+// Genre figures arrive as one template per panel (layout, trace styling) plus
+// a data-only payload per genre; numeric arrays are base64 typed arrays
+// ({dtype, bdata}), which Plotly decodes itself.
+function isObject(value) {
+    return value !== null && typeof value === 'object' && !Array.isArray(value);
+}
+
+function mergeValue(base, patch) {
+    if (isObject(base) && isObject(patch) && !('bdata' in patch)) {
+        const merged = Object.assign({}, base);
+        Object.keys(patch).forEach(key => {
+            merged[key] = key in base ? mergeValue(base[key], patch[key]) : patch[key];
+        });
+        return merged;
+    }
+    return patch;
+}
+
+// Same rules as scripts/payload.py merge_figure(): traces merge by position
+function mergeFigure(template, patch) {
+    if (!('base' in patch)) return patch;  // a complete figure (e.g. empty genre)
+    // Plotly writes into the objects it plots; keep the cached template clean
+    const base = structuredClone(template);
+    const rest = Object.assign({}, patch);
+    delete rest.base;
+    delete rest.data;
+    const fig = mergeValue(base, rest);
+    fig.data = (patch.data || []).map((trace, i) => i < base.data.length ? mergeValue(base.data[i], trace) : trace);
+    return fig;
+}
+
+// Each genre figure is merged once; switching back to a genre reuses it
+function genreFigure(panel, genre) {
+    const key = panel + '/' + genre;
+    if (!genreFigureCache[key]) {
+        genreFigureCache[key] = Promise.all([fetchFigure(templateUrl(panel)), fetchFigure(genreDataUrl(panel, genre))])
+            .then(([template, patch]) => mergeFigure(template, patch));
+        genreFigureCache[key].catch(() => delete genreFigureCache[key]);
+    }
+    return genreFigureCache[key];
+}
+
+// Fetch the (small) genre payloads while the browser is idle, one genre at a
+// time, so picking a genre later needs no round trip
+function prefetchGenres(genres) {
+    const idle = window.requestIdleCallback || (callback => setTimeout(callback, 50));
+    const queue = genres.slice();
+    const next = () => {
+        const genre = queue.shift();
+        if (genre === undefined) return;
+        Promise.all(GENRE_PANELS.map(panel => genreFigure(panel, genre)))
+            .catch(() => {})
+            .then(() => idle(next));
+    };
+    idle(next);
 }
 
 // Populate dropdown with available genres
-function populateGenreDropdown() {
+function populateGenreDropdown(genres) {
     const dropdown = document.getElementById("genreFilter");
-    // ensure graphs.genre_panel1 exists
-    if (!graphs.genre_panel1) return;
-    const genres = Object.keys(graphs.genre_panel1).sort();
-
-    genres.forEach(g => {
+    genres.slice().sort().forEach(g => {
         const op = document.createElement("option");
         op.value = g;
         op.textContent = g;
@@ -26,67 +115,60 @@ function populateGenreDropdown() {
 function updatePanelsByGenre() {
     const selected = document.getElementById("genreFilter").value;
 
-    if (selected === "All") {
-        plot("panel1", graphs.panel1);
-        plot("panel3", graphs.panel3);
-        plot("panel5", graphs.panel5);
-    } else {
-        // Panel-1: genre-specific keywords
-        if (graphs.genre_panel1 && graphs.genre_panel1[selected]) {
-            plot("panel1", graphs.genre_panel1[selected]);
-        } else {
-            plot("panel1", graphs.panel1);
-        }
-
-        // Panel-3: genre-specific revenue time series (single-line)
-        if (graphs.genre_panel3 && graphs.genre_panel3[selected]) {
-            plot("panel3", graphs.genre_panel3[selected]);
-        } else {
-            plot("panel3", graphs.panel3);
-        }
-
-        // Panel-5: genre-specific sunburst
-        if (graphs.genre_panel5 && graphs.genre_panel5[selected]) {
-            plot("panel5", graphs.genre_panel5[selected]);
-        } else {
-            plot("panel5", graphs.panel5);
-        }
-    }
+    GENRE_PANELS.forEach(panel => {
+        const figure = selected === "All" ? fetchFigure(panelUrl(panel)) : genreFigure(panel, selected);
+        figure
+            .catch(() => fetchFigure(panelUrl(panel)))
+            .then(fig => {
+                // ignore responses for a genre that is no longer selected
+                if (document.getElementById("genreFilter").value === selected) plot(panel, fig);
+            });
+    });
 }
 
+// Show build progress in the loading overlay
+function showProgress(build) {
+    var text = document.getElementById('loading-text');
+    if (!text) return;
+    var msg = build.data_loaded ? 'Building figures' : 'Loading data';
+    if (build.total) msg += ' (' + build.done + '/' + build.total + ')';
+    text.textContent = msg + ', please wait...';
+}
 
-// Called after graphs are loaded via AJAX
-function renderAllGraphs(graphsObj) {
-    window.graphs = graphsObj;
-    populateGenreDropdown();
-    const selected_panel = document.getElementById("genreFilter");
-    if (selected_panel) selected_panel.addEventListener("change", updatePanelsByGenre);
-    plot('panel1', graphs.panel1);
-    plot('panel2', graphs.panel2);
-    plot('panel3', graphs.panel3);
-    plot('panel4', graphs.panel4);
-    plot('panel5', graphs.panel5);
+// Poll /status while the first panels are on their way
+function pollStatus() {
+    return setInterval(() => {
+        fetch('/status').then(r => r.json()).then(showProgress).catch(() => {});
+    }, 1000);
 }
 
 
 document.addEventListener('DOMContentLoaded', function() {
-    fetch('/get_graphs')
-        .then(response => {
-            if (!response.ok) throw new Error('Network response was not ok');
-            return response.json();
-        })
-        .then(graphs => {
-            window.graphs = graphs;
-            if (typeof renderAllGraphs === 'function') {
-                renderAllGraphs(graphs);
-            }
+    const poller = pollStatus();
+    const panels = ["panel1", "panel2", "panel3", "panel4", "panel5"];
+
+    const genres = fetch('/genres').then(response => {
+        if (!response.ok) throw new Error('Network response was not ok');
+        return response.json();
+    });
+
+    Promise.all(panels.map(panel => fetchFigure(panelUrl(panel)).then(fig => plot(panel, fig))))
+        .then(() => {
             var overlay = document.getElementById('loading-overlay');
             if (overlay) overlay.style.display = 'none';
             console.log('[INFO] Graphs loaded and rendered.');
+            return genres;
+        })
+        .then(genreList => {
+            populateGenreDropdown(genreList);
+            const selected_panel = document.getElementById("genreFilter");
+            if (selected_panel) selected_panel.addEventListener("change", updatePanelsByGenre);
+            prefetchGenres(genreList);
         })
         .catch(error => {
             var overlay = document.getElementById('loading-overlay');
             if (overlay) overlay.innerHTML = '<p style="color:red;font-size:1.2em;">Failed to load dashboard data.<br>' + error + '</p>';
             console.error('[ERROR] Failed to load graphs:', error);
-        });
+        })
+        .finally(() => clearInterval(poller));
 });
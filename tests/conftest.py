@@ -0,0 +1,89 @@
+# tests/conftest.py
+
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.synthetic import generate
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A small synthetic dataset, made the default data directory."""
+    from scripts import scrape
+
+    path = tmp_path / "data"
+    generate(str(path), rows=300)
+    monkeypatch.setattr(scrape, "DATA_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def movies(data_dir):
+    """load_data() of `data_dir`, uncached."""
+    from scripts.scrape import load_data
+
+    return load_data(str(data_dir), use_cache=False)
+
+
+@pytest.fixture
+def tables(movies):
+    from scripts.model import build_tables
+
+    return build_tables(movies)
+
+
+@pytest.fixture
+def client(data_dir):
+    """Flask test client over `data_dir`, with no state left from other tests."""
+    import app as dashboard
+
+    def reset():
+        for state in (dashboard.DATA, dashboard.GRAPHS, dashboard.ENCODED, dashboard.STATIC):
+            state.clear()
+        dashboard.BUILD.update(status="idle", stage=None, done=0, total=0, error=None)
+
+    reset()
+    dashboard.app.config.update(USE_CACHE=False, UPDATES_DIR=None, COMPACT=False, WORKERS=1)
+    yield dashboard.app.test_client()
+    if dashboard._build_thread is not None:
+        dashboard._build_thread.join()
+    reset()
+
+
+@pytest.fixture
+def blank_revenue_updates(data_dir):
+    """data/updates/ re-sending the first 5 movies with their revenue blanked; returns their rows."""
+    updates_dir = data_dir / "updates"
+    os.makedirs(updates_dir)
+    movies = pd.read_csv(data_dir / "movies_metadata.csv", dtype=str, keep_default_na=False)
+    ids = pd.to_numeric(movies["id"], errors="coerce")
+    movies = movies[ids.notna()].head(5).assign(revenue="")
+    movies.to_csv(updates_dir / "movies_metadata.csv", index=False)
+    for name in ("credits.csv", "keywords.csv"):
+        table = pd.read_csv(data_dir / name, dtype=str, keep_default_na=False)
+        table[table["id"].isin(movies["id"])].to_csv(updates_dir / name, index=False)
+    return movies
+
+
+def _close(a, b):
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(_close(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and all(_close(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) or isinstance(b, float):
+        return a == pytest.approx(b, rel=1e-9)
+    return a == b
+
+
+@pytest.fixture
+def same_figure():
+    """same_figure(a, b): two figure JSON documents plot the same data (floats to 1e-9)."""
+    def compare(a, b):
+        return _close(json.loads(a)["data"], json.loads(b)["data"])
+    return compare
@@ -0,0 +1,40 @@
+# tests/test_build.py
+
+import threading
+
+import app as dashboard
+from scripts import metrics
+
+PANELS = ["panel1", "panel2", "panel3", "panel4", "panel5"]
+
+
+def calls(stage):
+    return metrics.snapshot()["stages"].get(stage, {}).get("calls", 0)
+
+
+def test_panels_requested_during_a_build_are_built_once(client):
+    before = {panel: calls(panel) for panel in PANELS}
+    dashboard.start_build()
+    responses = {}
+
+    def fetch(panel):
+        responses[panel] = client.get(f"/graphs/{panel}")
+
+    threads = [threading.Thread(target=fetch, args=(panel,)) for panel in PANELS]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert dashboard.BUILD["status"] == "ready"
+    for panel in PANELS:
+        assert responses[panel].status_code == 200
+        assert responses[panel].get_json() == client.get("/get_graphs").get_json()[panel]
+        assert calls(panel) - before[panel] == 1, panel
+
+
+def test_lazy_panel_without_a_build(client):
+    response = client.get("/graphs/panel3")
+    assert response.status_code == 200
+    assert client.get("/graphs/panel3", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+    assert client.get("/graphs/nope").status_code == 404
@@ -0,0 +1,37 @@
+# tests/test_compact.py
+
+import app as dashboard
+from scripts.scrape import load_compact, memory_usage
+
+URLS = [
+    "/get_graphs?wait=1",
+    "/genres",
+    "/directors?sort=rating&limit=1000",
+    "/graphs/panel2?sort=films&limit=50",
+    "/query?genre=Drama&years=1980-2010",
+    "/search?q=a&limit=20",
+]
+
+
+def responses(client, compact, movie_ids):
+    for state in (dashboard.DATA, dashboard.GRAPHS, dashboard.ENCODED):
+        state.clear()
+    dashboard.BUILD.update(status="idle", stage=None, done=0, total=0, error=None)
+    dashboard.app.config["COMPACT"] = compact
+    urls = URLS + [f"/movie/{movie_id}" for movie_id in movie_ids]
+    return {url: client.get(url).get_data() for url in urls}
+
+
+def test_compact_mode_answers_like_the_full_frame(client, movies):
+    movie_ids = movies["id"].head(20).tolist()
+    full = responses(client, False, movie_ids)
+    compact = responses(client, True, movie_ids)
+    for url, body in full.items():
+        assert compact[url] == body, url
+
+
+def test_compact_frame_is_smaller(data_dir, movies):
+    compact, lists = load_compact(str(data_dir), use_cache=False)
+    assert compact["id"].tolist() == movies["id"].tolist()
+    assert str(compact["vote_average"].dtype) == "float32"
+    assert memory_usage(compact, lists) < memory_usage(movies)
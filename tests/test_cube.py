@@ -0,0 +1,64 @@
+# tests/test_cube.py
+
+import pytest
+
+from scripts.cube import Cube, parse_years
+from scripts.incremental import aggregates_figure
+from scripts.model import build_tables
+from scripts.pipeline import PANELS, panel_figure
+
+
+@pytest.mark.parametrize("text, expected", [
+    (None, None), ("", None), ("1995", (1995, 1995)), ("1990-2000", (1990, 2000)), ("2000-2000", (2000, 2000)),
+])
+def test_parse_years(text, expected):
+    assert parse_years(text) == expected
+
+
+@pytest.mark.parametrize("text", ["1990-", "-2000", "-", "abc", "1990-abc", "2000-1990", "1990-1995-2000"])
+def test_parse_years_rejects(text):
+    with pytest.raises(ValueError):
+        parse_years(text)
+
+
+@pytest.mark.parametrize("years", ["1990-", "-2000", "2000-1990"])
+def test_query_rejects_half_open_and_empty_ranges(client, years):
+    response = client.get("/query", query_string={"years": years, "panels": "panel1"})
+    assert response.status_code == 400
+    assert years in response.get_json()["error"]
+
+
+def test_unfiltered_slice_matches_the_panels(tables, same_figure):
+    whole = Cube(tables).query()
+    for panel in PANELS:
+        assert same_figure(aggregates_figure(whole, panel), panel_figure(tables, panel)), panel
+
+
+@pytest.mark.parametrize("query", [
+    dict(years=(1990, 2010)),
+    dict(genre="Drama"),
+    dict(country="France", years=(1980, 2020)),
+    dict(genre="Comedy", country="United States of America", years=(1970, 2023)),
+])
+def test_slice_matches_panels_of_the_matching_movies(movies, tables, same_figure, query):
+    # the brute-force answer: the panels over just the matching movies, with
+    # a filtered genre/country dimension reduced to the value filtered on
+    genre, country, years = query.get("genre"), query.get("country"), query.get("years")
+    mask = movies["year"].notna()
+    if years:
+        mask &= movies["year"].between(*years)
+    if genre:
+        mask &= movies["genres_list"].map(lambda genres: genre in genres)
+    if country:
+        mask &= movies["countries"].map(lambda countries: country in countries)
+    subset = movies[mask].reset_index(drop=True)
+    assert len(subset) > 0
+    if genre:
+        subset = subset.assign(genres_list=[[genre]] * len(subset))
+    if country:
+        subset = subset.assign(countries=[[country]] * len(subset))
+
+    cube_slice = Cube(tables).query(**query)
+    expected = build_tables(subset)
+    for panel in PANELS:
+        assert same_figure(aggregates_figure(cube_slice, panel), panel_figure(expected, panel)), panel
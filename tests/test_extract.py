@@ -0,0 +1,53 @@
+# tests/test_extract.py
+
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.bench_extract import COLUMNS, ast_director, ast_names, ast_top_actor
+from scripts import extract
+
+CELLS = [
+    "[{'id': 16, 'name': 'Animation'}, {'id': 35, 'name': 'Comedy'}]",
+    "[{'id': 1, 'name':'a'}]",                    # no space after the colon
+    "[{'id': 1, 'name':   'a'}, {'id': 2, 'name':'b'}]",
+    "[{'id': 1, 'name': }]",                      # empty value
+    "[{'id': 1, 'name': nan}]",                   # not a literal
+    "[{'id': 1, 'name': \"O'Brien\"}]",
+    "[{'id': 1, 'name': 'It\\'s'}]",
+    "[]",
+    "",
+    "nan",
+    float("nan"),
+    "[{'id': 1, 'name': 'a'}",                    # truncated
+]
+
+CREW = [
+    "[{'job': 'Producer', 'name': 'p'}, {'job': 'Director', 'name': 'd'}]",
+    "[{'job':'Director', 'name':'d'}]",
+    "[{'job': 'Director', 'name': }]",
+    "[{'job': 'Director', 'name': nan}]",
+    "[{'job': 'Writer', 'name': 'w'}]",
+]
+
+
+@pytest.mark.parametrize("cell", CELLS)
+def test_names_match_ast(cell):
+    assert extract.names(cell) == ast_names(cell)
+
+
+@pytest.mark.parametrize("cell", CELLS)
+def test_first_name_matches_ast(cell):
+    assert extract.first_name(cell) == ast_top_actor(cell)
+
+
+@pytest.mark.parametrize("cell", CELLS + CREW)
+def test_director_matches_ast(cell):
+    assert extract.director(cell) == ast_director(cell)
+
+
+def test_columns_match_ast(data_dir):
+    for csv, column, reference, fast in COLUMNS:
+        cells = pd.read_csv(os.path.join(data_dir, csv), low_memory=False)[column].tolist()
+        assert [fast(c) for c in cells] == [reference(c) for c in cells], column
@@ -0,0 +1,66 @@
+# tests/test_graphstore.py
+
+import pytest
+
+import app as dashboard
+from scripts.graphstore import GraphStore, write_store
+from scripts.pipeline import build_graphs
+from scripts.prerender import responses
+from scripts.visualize import genre_templates
+
+
+@pytest.fixture
+def graphs(tables):
+    return build_graphs(tables)
+
+
+def write(path, graphs, version):
+    genres = list(graphs["genre_panel1"])
+    write_store(str(path), graphs, genre_templates(), genres, version)
+    return dict(responses(graphs, genre_templates(), genres))
+
+
+def body(store, url, encoding=None):
+    return bytes(store.get(url).body(encoding))
+
+
+def test_store_answers_every_response(graphs, tmp_path):
+    path = tmp_path / "graphs.store"
+    expected = write(path, graphs, "v1")
+    store = GraphStore(str(path))
+    assert store.manifest["version"] == "v1"
+    for url, response in expected.items():
+        assert body(store, url) == (response.encode() if isinstance(response, str) else response), url
+    assert store.get("/graphs/nope") is None
+
+
+def test_replaced_store_is_remapped(graphs, tmp_path):
+    path = tmp_path / "graphs.store"
+    write(path, graphs, "v1")
+    store = GraphStore(str(path))
+    old_panel1 = body(store, "/graphs/panel1")
+    held = store.get("/graphs/panel1").body("gzip")  # a slice of the old mapping
+    held_bytes = bytes(held)
+
+    swapped = dict(graphs, panel1=graphs["panel2"])
+    write(path, swapped, "v2")
+    assert store.manifest["version"] == "v2"
+    assert body(store, "/graphs/panel1") == body(store, "/graphs/panel2") != old_panel1
+    # responses still streaming from the old file are unaffected
+    assert bytes(held) == held_bytes
+
+
+def test_app_serves_a_replaced_store(client, graphs, tmp_path):
+    path = tmp_path / "graphs.store"
+    write(path, graphs, "v1")
+    dashboard.STATIC["store"] = GraphStore(str(path))
+    first = client.get("/graphs/panel1")
+    assert first.status_code == 200
+    assert client.get("/status").get_json()["version"] == "v1"
+    assert client.get("/graphs/panel1", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    write(path, dict(graphs, panel1=graphs["panel2"]), "v2")
+    second = client.get("/graphs/panel1", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.get_data() == client.get("/graphs/panel2").get_data()
+    assert client.get("/status").get_json()["version"] == "v2"
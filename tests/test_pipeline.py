@@ -0,0 +1,37 @@
+# tests/test_pipeline.py
+
+import threading
+import time
+
+import pytest
+
+from scripts import metrics
+from scripts.pipeline import build_graphs, fork_available
+
+
+@pytest.mark.skipif(not fork_available(), reason="needs fork")
+def test_workers_match_sequential_build(tables):
+    assert build_graphs(tables, workers=3) == build_graphs(tables, workers=1)
+
+
+@pytest.mark.skipif(not fork_available(), reason="needs fork")
+def test_fork_while_another_thread_records_metrics(tables):
+    # a worker forked while this thread holds metrics._lock must not inherit it locked
+    stop = threading.Event()
+
+    def busy():
+        while not stop.is_set():
+            with metrics._lock:
+                time.sleep(0.001)
+
+    thread = threading.Thread(target=busy, daemon=True)
+    thread.start()
+    result = {}
+    builder = threading.Thread(target=lambda: result.update(graphs=build_graphs(tables, workers=4)), daemon=True)
+    try:
+        builder.start()
+        builder.join(timeout=60)
+    finally:
+        stop.set()
+    assert not builder.is_alive(), "build_graphs hung in a forked worker"
+    assert set(result["graphs"]) >= {"panel1", "panel5"}
@@ -0,0 +1,35 @@
+# tests/test_prerender.py
+
+import gzip
+import json
+import os
+import re
+
+import app as dashboard
+from scripts.prerender import write_build, StaticBuild
+from scripts.visualize import genre_templates
+
+
+def test_build_is_a_whole_site(client, tmp_path):
+    dashboard.run_batch()
+    data = dashboard.get_data()
+    out = tmp_path / "out"
+    manifest = write_build(str(out), dashboard.GRAPHS, genre_templates(), list(data["breakdown"]), data["version"])
+
+    # the page and the assets it links to
+    page = (out / "index.html").read_text()
+    for asset in re.findall(r'(?:href|src)="\.\./(static/[^"]+)"', page):
+        assert (out / asset).is_file(), asset
+
+    # every URL the page requests is <URL>.json, holding what the app answers
+    genre = manifest["genres"][0]
+    urls = ["/genres", "/graphs/panel1", "/graphs/panel1/template", f"/graphs/panel1/genre/{genre}/data"]
+    for url in urls:
+        assert url in manifest["files"], url
+        body = (out / (url.lstrip("/") + ".json")).read_bytes()
+        assert json.loads(body) == client.get(url).get_json(), url
+        assert gzip.decompress((out / (url.lstrip("/") + ".json.gz")).read_bytes()) == body
+
+    build = StaticBuild(str(out))
+    assert build.get("/graphs/panel2").etags[None] == manifest["files"]["/graphs/panel2"]["etags"]["identity"]
+    assert not os.path.exists(out / "static.json")
@@ -0,0 +1,76 @@
+# tests/test_refresh.py
+
+import math
+
+import pandas as pd
+import pytest
+
+import app as dashboard
+from scripts.model import build_tables
+from scripts.payload import merge_figure
+from scripts.pipeline import PANELS, build_graphs
+from scripts.scrape import SOURCES, load_data
+from scripts.visualize import genre_templates
+
+
+def test_refresh_blanks_revenue(client, blank_revenue_updates):
+    response = client.post("/refresh")
+    assert response.status_code == 200
+    assert response.get_json()["changed"] > 0
+    # the updates may carry movies load_data() filters out (years outside 1960-2023)
+    movies = [client.get(f"/movie/{movie_id}") for movie_id in blank_revenue_updates["id"].astype(int)]
+    movies = [response.get_json() for response in movies if response.status_code == 200]
+    assert movies
+    for movie in movies:
+        assert movie["revenue"] is None
+        assert movie["vote_average"] is None or not math.isnan(movie["vote_average"])
+
+
+def test_refresh_without_updates(client):
+    response = client.post("/refresh")
+    assert response.status_code == 404
+    assert "no updates found" in response.get_json()["error"]
+
+
+def _replace(full, part):
+    return pd.concat([full[~full["id"].isin(part["id"])], part])
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_refresh_matches_a_full_rebuild(client, data_dir, movies, same_figure, tmp_path, compact):
+    dashboard.app.config["COMPACT"] = compact
+    read = {name: pd.read_csv(data_dir / name, dtype=str, keep_default_na=False) for name in SOURCES}
+    ids = movies["id"].astype(str).head(3).tolist()
+
+    # a new genre for one movie, new revenue, a new director, new keywords and a new movie
+    updates = {name: table[table["id"].isin(ids)].copy() for name, table in read.items()}
+    meta, credits, keywords = (updates[name] for name in SOURCES)
+    meta.loc[meta["id"] == ids[0], "genres"] = "[{'id': 37, 'name': 'Brand New Genre'}]"
+    meta.loc[meta["id"] == ids[1], "revenue"] = "123456789012"
+    credits.loc[credits["id"] == ids[2], "crew"] = "[{'job': 'Director', 'name': 'Zed New'}]"
+    keywords.loc[keywords["id"] == ids[1], "keywords"] = "[{'id': 1, 'name': 'brandnewkw'}]"
+    for name, table in updates.items():
+        added = table[table["id"] == ids[1]].assign(id="99999999")
+        updates[name] = pd.concat([table, added.assign(title="Brand New")] if name == SOURCES[0] else [table, added])
+
+    updates_dir, merged_dir = data_dir / "updates", tmp_path / "merged"
+    updates_dir.mkdir()
+    merged_dir.mkdir()
+    for name in SOURCES:
+        updates[name].to_csv(updates_dir / name, index=False)
+        _replace(read[name], updates[name]).to_csv(merged_dir / name, index=False)
+
+    assert client.get("/get_graphs?wait=1").status_code == 200
+    response = client.post("/refresh").get_json()
+    assert response["changed"] == 4
+    assert "Brand New Genre" in client.get("/genres").get_json()
+
+    rebuilt = build_graphs(build_tables(load_data(str(merged_dir), use_cache=False)))
+    templates = genre_templates()
+    for panel in PANELS:
+        assert same_figure(client.get(f"/graphs/{panel}").get_data(), rebuilt[panel]), panel
+    for panel in ["panel1", "panel3", "panel5"]:
+        assert list(rebuilt[f"genre_{panel}"]) == client.get("/genres").get_json()
+        for genre, payload in rebuilt[f"genre_{panel}"].items():
+            got = client.get(f"/graphs/{panel}/genre/{genre}").get_data()
+            assert same_figure(got, merge_figure(templates[panel], payload)), (panel, genre)
@@ -0,0 +1,73 @@
+# tests/test_scrape.py
+
+import os
+
+import pandas as pd
+import pandas.testing as pdt
+
+from scripts import cache, extract
+from scripts.scrape import CACHE_VERSION, SOURCES, load_data
+
+
+def test_chunked_read_matches_whole_files(data_dir, movies):
+    for chunksize in [None, 7, 100000]:
+        pdt.assert_frame_equal(load_data(str(data_dir), use_cache=False, chunksize=chunksize), movies)
+
+
+def test_cache_is_reused_until_a_source_changes(data_dir, movies, capsys):
+    pdt.assert_frame_equal(load_data(str(data_dir)), movies)
+    assert os.path.exists(data_dir / ".cache" / "movies.pkl")
+    capsys.readouterr()
+
+    pdt.assert_frame_equal(load_data(str(data_dir)), movies)
+    assert "loaded from cache" in capsys.readouterr().out
+
+    # touched but unchanged: still a hit
+    os.utime(data_dir / "credits.csv")
+    cache._KNOWN.clear()
+    load_data(str(data_dir))
+    assert "loaded from cache" in capsys.readouterr().out
+
+    # a changed revenue: reparsed, and the change shows up
+    meta = pd.read_csv(data_dir / "movies_metadata.csv", dtype=str, keep_default_na=False)
+    movie_id = movies["id"].iloc[0]
+    meta.loc[meta["id"] == str(movie_id), "revenue"] = "4242"
+    meta.to_csv(data_dir / "movies_metadata.csv", index=False)
+    reloaded = load_data(str(data_dir))
+    assert "loaded from cache" not in capsys.readouterr().out
+    assert reloaded.loc[reloaded["id"] == movie_id, "revenue"].tolist() == [4242]
+    pdt.assert_frame_equal(load_data(str(data_dir)), reloaded)
+
+
+def test_stale_cache_version_is_ignored(data_dir, movies, monkeypatch, capsys):
+    load_data(str(data_dir))
+    monkeypatch.setattr(cache, "CACHE_VERSION", CACHE_VERSION + 1)
+    capsys.readouterr()
+    pdt.assert_frame_equal(load_data(str(data_dir)), movies)
+    assert "loaded from cache" not in capsys.readouterr().out
+
+
+def test_side_tables_are_joined_by_id(data_dir, movies, tmp_path):
+    # credits/keywords in another order, with a duplicated id (the first row wins)
+    shuffled = tmp_path / "shuffled"
+    shuffled.mkdir()
+    for name in SOURCES:
+        table = pd.read_csv(data_dir / name, dtype=str, keep_default_na=False)
+        if name != "movies_metadata.csv":
+            table = table.sample(frac=1, random_state=0)
+            duplicate = table[table["id"] == str(movies["id"].iloc[0])].assign(cast="[]", crew="[]", keywords="[]")
+            table = pd.concat([table, duplicate[table.columns]])
+        table.to_csv(shuffled / name, index=False)
+    pdt.assert_frame_equal(load_data(str(shuffled), use_cache=False), movies)
+
+    # the reference: a left merge on id, as the original loader did for credits
+    credits = pd.read_csv(data_dir / "credits.csv")
+    credits["id"] = pd.to_numeric(credits["id"], errors="coerce")
+    credits = credits.dropna(subset=["id"]).drop_duplicates("id").astype({"id": int})
+    credits = credits.assign(top_actor=credits["cast"].map(extract.first_name),
+                             director=credits["crew"].map(extract.director))
+    merged = movies[["id"]].merge(credits[["id", "top_actor", "director"]], on="id", how="left")
+    for column in ["top_actor", "director"]:
+        expected = merged[column].where(merged[column].notna(), None).tolist()
+        got = movies[column].where(movies[column].notna(), None).tolist()
+        assert got == expected, column
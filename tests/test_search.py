@@ -0,0 +1,37 @@
+# tests/test_search.py
+
+import json
+
+import pytest
+
+import app as dashboard
+
+
+def test_search_after_refresh_with_blank_revenue(client, blank_revenue_updates):
+    assert client.post("/refresh").status_code == 200
+    movie_id = int(blank_revenue_updates["id"].iloc[0])
+    row = dashboard.get_data()["aggregates"].rows[movie_id][0]
+    name = row.top_actor or row.director
+
+    response = client.get("/search", query_string={"q": name, "limit": 50})
+    assert response.status_code == 200
+    # strict JSON: a NaN anywhere fails the parse
+    matches = json.loads(response.get_data(as_text=True), parse_constant=pytest.fail)["matches"]
+    person = next(m for m in matches if m["name"] == name)
+    films = {m["id"]: m for m in person["movies"]}
+    assert films[movie_id]["revenue"] is None
+    assert person["revenue"] >= 0
+    assert person["rating"] is None or 0 <= person["rating"] <= 10
+
+
+def test_search_ranks_by_films(client):
+    matches = client.get("/search?q=a&details=0&limit=20").get_json()["matches"]
+    films = [m["films"] for m in matches]
+    assert films == sorted(films, reverse=True)
+
+
+@pytest.mark.parametrize("query", ["limit=abc", "limit=0", "limit=51", "limit=2.5", "role=nobody"])
+def test_search_rejects_bad_arguments(client, query):
+    response = client.get(f"/search?q=a&{query}")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
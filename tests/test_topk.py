@@ -0,0 +1,55 @@
+# tests/test_topk.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts import topk
+from scripts.model import genre_breakdown, genre_keyword_chunks, keywords_per_genre, top_keywords
+
+
+@pytest.fixture
+def approx(monkeypatch):
+    def use(capacity):
+        monkeypatch.setattr(topk, "APPROX_CAPACITY", capacity)
+    return use
+
+
+def test_genre_keyword_chunks_cover_every_pair(tables):
+    genres = tables.genres["genre"].cat.categories
+    keywords = tables.keywords["keyword"].cat.categories
+    pairs = [(genres[g], keywords[k]) for chunk in genre_keyword_chunks(tables, movies=7) for g, k in zip(*chunk)]
+    counts = pd.Series(1, index=pd.MultiIndex.from_tuples(pairs)).groupby(level=[0, 1]).sum()
+    expected = keywords_per_genre(tables)
+    expected = expected[expected > 0]
+    assert dict(counts.items()) == {(str(g), str(k)): n for (g, k), n in expected.items()}
+
+
+def test_approx_matches_exact_when_capacity_covers_every_name(tables, approx):
+    exact_keywords, exact_breakdown = top_keywords(tables, 50), genre_breakdown(tables)
+    approx(len(tables.keywords["keyword"].cat.categories) + len(tables.movies))
+    assert top_keywords(tables, 50).to_dict() == exact_keywords.to_dict()
+    for genre, exact in exact_breakdown.items():
+        got = genre_breakdown(tables)[genre]
+        assert got.keywords.to_dict() == exact.keywords.to_dict(), genre
+        assert got.actors.to_dict() == exact.actors.to_dict(), genre
+
+
+def test_space_saving_keeps_heavy_hitters():
+    rng = np.random.default_rng(0)
+    codes = np.concatenate([np.repeat(np.arange(5), 2000), rng.integers(5, 5000, 20000)])
+    rng.shuffle(codes)
+    names = [f"n{i}" for i in range(5000)]
+    top = topk.approx_top_k(codes, names, 5, capacity=100)
+    assert set(top.index) == {f"n{i}" for i in range(5)}
+    # counts overestimate, never under
+    assert (top.to_numpy() >= 2000).all()
+
+
+def test_grouped_top_k_is_the_same_over_any_chunking():
+    rng = np.random.default_rng(1)
+    groups, codes = rng.integers(0, 4, 10000), rng.integers(0, 300, 10000)
+    names = [f"k{i}" for i in range(300)]
+    whole = topk.grouped_top_k([(groups, codes)], 4, names, 10)
+    chunked = topk.grouped_top_k(((groups[i:i + 999], codes[i:i + 999]) for i in range(0, 10000, 999)), 4, names, 10)
+    assert {g: s.to_dict() for g, s in whole.items()} == {g: s.to_dict() for g, s in chunked.items()}
@@ -0,0 +1,30 @@
+# wsgi.py
+
+"""
+Production entry point: several gunicorn workers serving one graph store.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn.conf.py builds the store once, in a separate process, before any
+worker starts. Every worker maps the same file (GRAPH_STORE, default
+data/.cache/graphs.store) read-only instead of loading the CSVs and
+building the figures itself. Rebuild it at any time with
+
+    python app.py --build-store data/.cache/graphs.store
+
+and the workers switch to the new file on their next request. The build
+is skipped when the store already holds the current version (same CSVs,
+code and options).
+"""
+
+import os
+
+from app import app, STATIC
+from scripts.graphstore import GraphStore
+
+__all__ = ["app"]  # what gunicorn serves (wsgi:app)
+
+# not scripts.scrape.DATA_DIR: importing scrape would pull pandas into every worker
+STORE_PATH = os.environ.get("GRAPH_STORE") or os.path.join(os.path.dirname(__file__), "data", ".cache", "graphs.store")
+
+STATIC["store"] = GraphStore(STORE_PATH)